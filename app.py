@@ -16,7 +16,7 @@ from datetime import datetime, timedelta
 import logging
 
 # Import custom modules
-from auth.roles import RoleManager
+from auth.roles import RoleManager, dashboard_url
 from auth.session_manager import SessionManager
 from ai_engine.predictor import InventoryPredictor
 from warehouse.warehouse_controller import WarehouseController
@@ -89,13 +89,14 @@ def init_database():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             product_id INTEGER NOT NULL,
             warehouse_id INTEGER NOT NULL,
-            quantity INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0 CHECK (quantity >= 0),
             reserved_quantity INTEGER NOT NULL DEFAULT 0,
             reorder_level INTEGER NOT NULL DEFAULT 10,
             max_stock_level INTEGER NOT NULL DEFAULT 1000,
             last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (product_id) REFERENCES products (id),
-            FOREIGN KEY (warehouse_id) REFERENCES warehouses (id)
+            FOREIGN KEY (warehouse_id) REFERENCES warehouses (id),
+            UNIQUE(product_id, warehouse_id)
         )
     ''')
     
@@ -160,7 +161,16 @@ def init_database():
             FOREIGN KEY (warehouse_id) REFERENCES warehouses (id)
         )
     ''')
-    
+
+    # Index for the report date filters; same name as setup_database.py's,
+    # so seeded databases don't get a second copy
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_stock_movements_date ON stock_movements(created_at)')
+    # Partial index: only products with an active reorder threshold
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_products_reorder
+        ON products(reorder_level) WHERE reorder_level > 0
+    ''')
+
     # Create default admin user
     cursor.execute('SELECT * FROM users WHERE username = ?', ('admin',))
     if cursor.fetchone() is None:
@@ -177,7 +187,17 @@ def init_database():
             INSERT INTO warehouses (name, location, capacity)
             VALUES (?, ?, ?)
         ''', ('Main Warehouse', 'New York, NY', 10000))
+
+    conn.commit()
+
+    # Build the warehouse indexes and stats now, so startup fails loudly if it can't
+    warehouse_controller.ensure_schema()
     
+    # Session tables must exist before the session manager's background workers start
+    session_manager.create_session_tables()
+
+    # Refresh planner statistics so the new indexes are picked up
+    cursor.execute('ANALYZE')
     conn.commit()
     conn.close()
     logger.info("Database initialized successfully")
@@ -802,13 +822,12 @@ def add_stock_movement():
         
         # Update inventory based on movement type
         if movement_type in ['in', 'adjustment']:
-            # Add to inventory
+            # Add to inventory; an upsert keeps the existing row, so the stats triggers see an UPDATE
             cursor.execute('''
-                INSERT OR REPLACE INTO inventory (product_id, warehouse_id, quantity)
-                VALUES (?, ?, COALESCE(
-                    (SELECT quantity FROM inventory WHERE product_id = ? AND warehouse_id = ?), 0
-                ) + ?)
-            ''', (product_id, warehouse_id, product_id, warehouse_id, quantity))
+                INSERT INTO inventory (product_id, warehouse_id, quantity)
+                VALUES (?, ?, ?)
+                ON CONFLICT(product_id, warehouse_id) DO UPDATE SET quantity = quantity + excluded.quantity
+            ''', (product_id, warehouse_id, quantity))
         elif movement_type in ['out']:
             # Remove from inventory
             cursor.execute('''
@@ -832,7 +851,7 @@ def admin_panel():
     """Admin panel for user and system management."""
     if 'user_id' not in session or session.get('role') != 'admin':
         flash('Access denied. Admin privileges required.', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(dashboard_url())
     
     conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
@@ -7,7 +7,7 @@ Supports admin, manager, and employee roles with different access levels.
 
 import sqlite3
 from functools import wraps
-from flask import session, redirect, url_for, flash
+from flask import session, redirect, url_for, flash, current_app
 import logging
 
 logger = logging.getLogger(__name__)
@@ -117,6 +117,22 @@ class RoleManager:
             logger.error(f"Error updating user role: {e}")
             return False, "Database error occurred"
 
+def _resolved_url(config_key, endpoint):
+    """Return the URL for an endpoint, resolving it only once per app."""
+    url = current_app.config.get(config_key)
+    if url is None:
+        url = url_for(endpoint)
+        current_app.config[config_key] = url
+    return url
+
+def login_url():
+    """Cached URL of the login page."""
+    return _resolved_url('LOGIN_URL', 'login')
+
+def dashboard_url():
+    """Cached URL of the dashboard page."""
+    return _resolved_url('DASHBOARD_URL', 'dashboard')
+
 def require_permission(permission):
     """Decorator to require a specific permission for a route."""
     def decorator(f):
@@ -124,12 +140,12 @@ def require_permission(permission):
         def decorated_function(*args, **kwargs):
             if 'user_id' not in session:
                 flash('Please log in to access this page.', 'error')
-                return redirect(url_for('login'))
+                return redirect(login_url())
             
             role_manager = RoleManager()
             if not role_manager.has_permission(session['user_id'], permission):
                 flash('You do not have permission to access this resource.', 'error')
-                return redirect(url_for('dashboard'))
+                return redirect(dashboard_url())
             
             return f(*args, **kwargs)
         return decorated_function
@@ -142,21 +158,21 @@ def require_role(required_role):
         def decorated_function(*args, **kwargs):
             if 'user_id' not in session:
                 flash('Please log in to access this page.', 'error')
-                return redirect(url_for('login'))
+                return redirect(login_url())
             
             role_manager = RoleManager()
             user_role = role_manager.get_user_role(session['user_id'])
             
             if not user_role:
                 flash('Unable to verify user role.', 'error')
-                return redirect(url_for('dashboard'))
+                return redirect(dashboard_url())
             
             user_level = role_manager.get_role_level(user_role)
             required_level = role_manager.get_role_level(required_role)
             
             if user_level < required_level:
                 flash(f'Access denied. {required_role.title()} privileges required.', 'error')
-                return redirect(url_for('dashboard'))
+                return redirect(dashboard_url())
             
             return f(*args, **kwargs)
         return decorated_function
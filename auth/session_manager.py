@@ -6,106 +6,430 @@ timeout handling, and activity tracking.
 """
 
 import sqlite3
-import secrets
-from datetime import datetime, timedelta
+import os
+import base64
+import hashlib
+import threading
+import queue
+import atexit
+import time
+from collections import OrderedDict
+from datetime import timedelta
 from flask import session, request
 import logging
+from db_config import apply_pragmas
 
 logger = logging.getLogger(__name__)
 
+# Columns the session code relies on; older user_sessions layouts lacking any
+# of them are rebuilt (sessions are transient, users simply log in again).
+# Only sha256(token) is stored, so a leaked database holds no usable tokens.
+SESSION_COLUMNS = {
+    'id', 'user_id', 'token_hash', 'ip_address', 'user_agent',
+    'created_at', 'last_activity', 'expires_at', 'is_active'
+}
+
+# Session tables, shared with setup_database.py so seeded databases start with
+# the current layout
+SESSION_TABLES_DDL = (
+    # User sessions table
+    '''
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            token_hash BLOB UNIQUE NOT NULL,
+            ip_address TEXT,
+            user_agent TEXT,
+            created_at INTEGER DEFAULT (strftime('%s', 'now')),
+            last_activity INTEGER DEFAULT (strftime('%s', 'now')),
+            expires_at INTEGER,
+            is_active INTEGER DEFAULT 1 NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''',
+
+    # Login attempts table for security
+    '''
+        CREATE TABLE IF NOT EXISTS login_attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ip_address TEXT NOT NULL,
+            username TEXT,
+            success INTEGER DEFAULT 0 NOT NULL,
+            attempted_at INTEGER DEFAULT (strftime('%s', 'now')),
+            user_agent TEXT
+        )
+    ''',
+
+    # Hot partition of login_attempts: new attempts land here and
+    # rows older than recent_attempts_window are archived hourly
+    '''
+        CREATE TABLE IF NOT EXISTS login_attempts_recent (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ip_address TEXT NOT NULL,
+            username TEXT,
+            success INTEGER DEFAULT 0 NOT NULL,
+            attempted_at INTEGER DEFAULT (strftime('%s', 'now')),
+            user_agent TEXT
+        )
+    ''',
+
+    # User activity log; session_token holds sha256(token) like token_hash
+    '''
+        CREATE TABLE IF NOT EXISTS user_activity (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            session_token TEXT,
+            action TEXT NOT NULL,
+            resource TEXT,
+            ip_address TEXT,
+            timestamp INTEGER DEFAULT (strftime('%s', 'now')),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''',
+)
+
+# Indexes matching the lookup/cleanup predicates, also reused by
+# setup_database.py. The partial indexes only cover the rows those queries
+# can ever match.
+SESSION_INDEX_DDL = (
+    '''
+        CREATE INDEX IF NOT EXISTS idx_login_attempts_recent_ip_time
+        ON login_attempts_recent(ip_address, attempted_at) WHERE success = 0
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS idx_sessions_user_active
+        ON user_sessions(user_id, is_active)
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS idx_sessions_active_user
+        ON user_sessions(user_id, created_at) WHERE is_active = 1
+    ''',
+    # Full rather than partial: the retention purge also matches ended sessions
+    '''
+        CREATE INDEX IF NOT EXISTS idx_sessions_expires_at
+        ON user_sessions(expires_at)
+    ''',
+    '''
+        CREATE INDEX IF NOT EXISTS idx_activity_user_ts
+        ON user_activity(user_id, timestamp)
+    ''',
+)
+
+# PRAGMA user_version once the one-off rewrites of data left by older
+# versions (TEXT timestamps, raw activity tokens) have been applied
+SESSION_DATA_VERSION = 1
+
+# Timestamp columns stored as integer unix-epoch seconds
+EPOCH_COLUMNS = {
+    'user_sessions': ('created_at', 'last_activity', 'expires_at'),
+    'login_attempts': ('attempted_at',),
+    'user_activity': ('timestamp',)
+}
+
+# Audit inserts, shared by the immediate and the batched write paths
+INSERT_LOGIN_ATTEMPT_SQL = '''
+    INSERT INTO login_attempts_recent (ip_address, username, success,
+                                       user_agent, attempted_at)
+    VALUES (?, ?, ?, ?, ?)
+'''
+INSERT_ACTIVITY_SQL = '''
+    INSERT INTO user_activity (user_id, session_token, action, resource,
+                               ip_address, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+class _ValidSessionCache:
+    """Small thread-safe LRU of session token hashes known to be valid until a deadline."""
+    
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # token_hash -> (user_id, valid_until)
+        self._lock = threading.Lock()
+    
+    def get(self, token_hash, user_id, now):
+        """Return True if the token is cached as valid for this user at `now`."""
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None:
+                return False
+            if entry[0] != user_id or now >= entry[1]:
+                del self._entries[token_hash]
+                return False
+            self._entries.move_to_end(token_hash)
+            return True
+    
+    def put(self, token_hash, user_id, valid_until):
+        with self._lock:
+            self._entries[token_hash] = (user_id, valid_until)
+            self._entries.move_to_end(token_hash)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def discard(self, token_hash):
+        with self._lock:
+            self._entries.pop(token_hash, None)
+    
+    def discard_user(self, user_id):
+        with self._lock:
+            for token in [t for t, entry in self._entries.items() if entry[0] == user_id]:
+                del self._entries[token]
+
 class SessionManager:
     """Manages user sessions and security."""
     
     def __init__(self):
         """Initialize the session manager."""
         self.database_path = 'database/inventory.db'
-        self.session_timeout = timedelta(hours=8)  # 8 hour session timeout
+        self.session_timeout = 8 * 3600  # 8 hour session timeout, in seconds
         self.max_concurrent_sessions = 3  # Maximum concurrent sessions per user
+        self.activity_refresh_threshold = 60  # Min seconds between activity writes
+        self.cleanup_interval = 600  # Seconds between expired-session sweeps
+        self.cleanup_batch_size = 1000  # Rows touched per write-lock hold in a sweep
+        self.session_retention = 30 * 86400  # Seconds before ended sessions are deleted
+        self.recent_attempts_window = 86400  # Seconds kept in login_attempts_recent
+        self.archive_interval = 3600  # Seconds between login attempt archive runs
+        self._local = threading.local()  # Per-thread read-only connections
+        self._write_conn = None  # Single connection shared by all writers
+        self._write_lock = threading.RLock()
+        
+        # Recently validated tokens skip the database for validation_cache_ttl
+        # seconds. Invalidation clears the entry in this process only, so the
+        # TTL bounds how long other worker processes keep honouring a revoked
+        # session; keep it short.
+        self.validation_cache_ttl = 2
+        self._valid_sessions = _ValidSessionCache(maxsize=4096)
+        
+        # Expired sessions are swept and audit rows are written in batches by
+        # background threads, started per process by start()
+        self.log_flush_interval = 0.25  # Seconds between audit log flushes
+        self.log_batch_size = 500  # Queue length that triggers an early flush
+        self._activity_q = queue.Queue(maxsize=10000)
+        self._attempt_q = queue.Queue(maxsize=10000)
+        self._stop_event = threading.Event()
+        self._flush_event = threading.Event()
+        self._worker_pid = None  # Process the background threads run in
+        atexit.register(self.stop)
+    
+    def start(self):
+        """
+        Start the session sweeper and audit log writer threads.
+        
+        Threads don't survive a fork, so a worker process forked after
+        start() gets its own threads (and a fresh writer connection) the
+        first time it queues an audit row or calls start() itself.
+        """
+        with self._write_lock:
+            if self._worker_pid == os.getpid():
+                return
+            if self._worker_pid is not None:
+                # SQLite connections must not be shared with the parent process
+                self._write_conn = None
+                self._local = threading.local()
+            self._worker_pid = os.getpid()
+            self._stop_event.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop,
+                                             name='session-sweeper', daemon=True)
+            self._sweeper.start()
+            self._log_writer = threading.Thread(target=self._log_writer_loop,
+                                                name='session-log-writer', daemon=True)
+            self._log_writer.start()
+    
+    def _writer(self):
+        """Return the shared writer connection; callers must hold _write_lock."""
+        if self._write_conn is None:
+            conn = sqlite3.connect(self.database_path, check_same_thread=False,
+                                   isolation_level=None, cached_statements=256)
+            apply_pragmas(conn)
+            self._write_conn = conn
+        return self._write_conn
+    
+    def _execute_write(self, sql, params=()):
+        """Run one statement on the writer connection and return its rows."""
+        with self._write_lock:
+            return self._writer().execute(sql, params).fetchall()
+    
+    def _execute_write_batched(self, sql, params=()):
+        """
+        Repeat a statement that touches at most cleanup_batch_size rows
+        (its last parameter) until a batch comes up short.
+        
+        Each batch is its own transaction, so the write lock is released and
+        readers get a turn between batches. Returns the total rows affected.
+        """
+        total = 0
+        while True:
+            with self._write_lock:
+                affected = self._writer().execute(sql, (*params, self.cleanup_batch_size)).rowcount
+            total += affected
+            if affected < self.cleanup_batch_size:
+                return total
+            time.sleep(0.01)
+    
+    def _sweep_loop(self):
+        """
+        Run cleanup_expired_sessions every cleanup_interval seconds and
+        archive_login_attempts every archive_interval seconds.
+        """
+        last_archive = time.monotonic()
+        while not self._stop_event.wait(self.cleanup_interval):
+            self.cleanup_expired_sessions()
+            if time.monotonic() - last_archive >= self.archive_interval:
+                self.archive_login_attempts()
+                last_archive = time.monotonic()
+    
+    def _log_writer_loop(self):
+        """Flush queued audit rows every log_flush_interval or on demand."""
+        while not self._stop_event.is_set():
+            self._flush_event.wait(self.log_flush_interval)
+            self._flush_event.clear()
+            self.flush_logs()
+    
+    def _enqueue(self, log_queue, row):
+        """Queue an audit row, flushing inline if the queue is full."""
+        if self._worker_pid != os.getpid():
+            self.start()
+        
+        try:
+            log_queue.put_nowait(row)
+        except queue.Full:
+            self.flush_logs()
+            log_queue.put_nowait(row)
+        
+        if log_queue.qsize() >= self.log_batch_size:
+            self._flush_event.set()
+    
+    @staticmethod
+    def _drain(log_queue):
+        """Remove and return everything currently in a queue."""
+        rows = []
+        try:
+            while True:
+                rows.append(log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return rows
+    
+    def flush_logs(self):
+        """Write queued login attempts and user activity, one transaction per table."""
+        self._write_batch(INSERT_LOGIN_ATTEMPT_SQL, self._drain(self._attempt_q), 'login attempts')
+        self._write_batch(INSERT_ACTIVITY_SQL, self._drain(self._activity_q), 'activity rows')
+    
+    def _write_batch(self, sql, rows, label):
+        """Insert rows in a single transaction; a failure drops only this batch."""
+        if not rows:
+            return
+        
+        try:
+            with self._write_lock:
+                conn = self._writer()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.executemany(sql, rows)
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+            
+        except Exception as e:
+            logger.error(f"Error flushing audit logs ({len(rows)} {label} dropped): {e}")
+    
+    def stop(self):
+        """Stop the background threads and write any queued audit rows."""
+        self._stop_event.set()
+        self._flush_event.set()
+        self.flush_logs()
+    
+    def _read_conn(self):
+        """Return this thread's read-only connection for lookup queries."""
+        conn = getattr(self._local, 'read_conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f'file:{self.database_path}?mode=ro', uri=True,
+                                   check_same_thread=False, cached_statements=256)
+            apply_pragmas(conn, read_only=True)
+            self._local.read_conn = conn
+        return conn
     
     def create_session_tables(self):
         """Create session-related database tables."""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            with self._write_lock:
+                cursor = self._writer().cursor()
             
-            # User sessions table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    session_token TEXT UNIQUE NOT NULL,
-                    ip_address TEXT,
-                    user_agent TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            ''')
+                self._drop_stale_sessions_table(cursor)
             
-            # Login attempts table for security
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS login_attempts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ip_address TEXT NOT NULL,
-                    username TEXT,
-                    success BOOLEAN DEFAULT FALSE,
-                    attempted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    user_agent TEXT
-                )
-            ''')
+                for statement in SESSION_TABLES_DDL:
+                    cursor.execute(statement)
             
-            # User activity log
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_activity (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    session_token TEXT,
-                    action TEXT NOT NULL,
-                    resource TEXT,
-                    ip_address TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            ''')
+                # Full-table rewrites, so they run once per database, not per startup
+                cursor.execute('PRAGMA user_version')
+                if cursor.fetchone()[0] < SESSION_DATA_VERSION:
+                    self._convert_timestamps_to_epoch(cursor)
+                    
+                    # Older versions logged raw tokens; hashes are stored as BLOBs
+                    cursor.execute('''
+                        UPDATE user_activity SET session_token = NULL
+                        WHERE typeof(session_token) = 'text'
+                    ''')
+                    cursor.execute(f'PRAGMA user_version = {SESSION_DATA_VERSION}')
+            
+                for statement in SESSION_INDEX_DDL:
+                    cursor.execute(statement)
             
-            conn.commit()
-            conn.close()
             logger.info("Session tables created successfully")
             
+            self.start()
+            
         except Exception as e:
             logger.error(f"Error creating session tables: {e}")
     
-    def generate_session_token(self):
-        """Generate a secure session token."""
-        return secrets.token_urlsafe(32)
+    def _drop_stale_sessions_table(self, cursor):
+        """Drop user_sessions if it predates the current column layout."""
+        cursor.execute("SELECT name FROM pragma_table_info('user_sessions')")
+        columns = {row[0] for row in cursor.fetchall()}
+        
+        if columns and not SESSION_COLUMNS <= columns:
+            cursor.execute('DROP TABLE user_sessions')
+            logger.info("Dropped outdated user_sessions table for rebuild")
+    
+    def _convert_timestamps_to_epoch(self, cursor):
+        """Rewrite TEXT timestamps left by older versions as epoch seconds."""
+        for table, columns in EPOCH_COLUMNS.items():
+            for column in columns:
+                cursor.execute(f'''
+                    UPDATE {table}
+                    SET {column} = CAST(strftime('%s', {column}) AS INTEGER)
+                    WHERE typeof({column}) = 'text'
+                ''')
+    
+    @staticmethod
+    def _hash_token(session_token):
+        """Return the sha256 digest stored in place of a raw session token."""
+        return hashlib.sha256(session_token.encode('utf-8')).digest()
+    
+    def generate_session_token(self, _urandom=os.urandom, _b64encode=base64.urlsafe_b64encode):
+        """Generate a secure session token (256 random bits, URL-safe base64)."""
+        return _b64encode(_urandom(32)).rstrip(b'=').decode('ascii')
     
     def create_session(self, user_id, ip_address=None, user_agent=None):
         """Create a new session for a user."""
         try:
-            # Clean up old sessions first
-            self.cleanup_expired_sessions(user_id)
-            
             # Check for maximum concurrent sessions
             if self.get_active_session_count(user_id) >= self.max_concurrent_sessions:
                 self.invalidate_oldest_session(user_id)
             
             session_token = self.generate_session_token()
             
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO user_sessions (user_id, session_token, ip_address, user_agent)
-                VALUES (?, ?, ?, ?)
-            ''', (user_id, session_token, ip_address, user_agent))
-            
-            conn.commit()
-            conn.close()
+            # created_at/last_activity take their strftime('%s', 'now') defaults
+            self._execute_write('''
+                INSERT INTO user_sessions (user_id, token_hash, ip_address, user_agent,
+                                           expires_at)
+                VALUES (?, ?, ?, ?, strftime('%s', 'now') + ?)
+            ''', (user_id, self._hash_token(session_token), ip_address, user_agent,
+                  self.session_timeout))
             
             # Set Flask session
             session['session_token'] = session_token
-            session['last_activity'] = datetime.now().isoformat()
+            session['last_activity_epoch'] = int(time.time())
             
             logger.info(f"Session created for user {user_id}")
             return session_token
@@ -115,29 +439,37 @@ class SessionManager:
             return None
     
     def validate_session(self, user_id, session_token):
-        """Validate if a session is still valid."""
+        """
+        Validate a session and refresh its activity timestamp in one statement.
+        
+        The timeout check and the refresh happen atomically in a single
+        UPDATE ... RETURNING; last_activity is only rewritten once it is older
+        than the refresh threshold so rapid page clicks don't touch the row.
+        Valid tokens are then served from an in-process cache for
+        validation_cache_ttl seconds.
+        """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT created_at, last_activity, is_active
-                FROM user_sessions
-                WHERE user_id = ? AND session_token = ?
-            ''', (user_id, session_token))
-            
-            result = cursor.fetchone()
-            conn.close()
+            now = int(time.time())
+            token_hash = self._hash_token(session_token)
+            if self._valid_sessions.get(token_hash, user_id, now):
+                return True
             
-            if not result or not result[2]:  # Session doesn't exist or is inactive
-                return False
+            refresh_before = now - self.activity_refresh_threshold
             
-            # Check session timeout
-            last_activity = datetime.fromisoformat(result[1])
-            if datetime.now() - last_activity > self.session_timeout:
-                self.invalidate_session(session_token)
+            result = self._execute_write('''
+                UPDATE user_sessions
+                SET last_activity = CASE WHEN last_activity < ? THEN ? ELSE last_activity END,
+                    expires_at = CASE WHEN last_activity < ? THEN ? ELSE expires_at END
+                WHERE token_hash = ? AND user_id = ? AND is_active = 1
+                  AND expires_at > ?
+                RETURNING expires_at
+            ''', (refresh_before, now, refresh_before, now + self.session_timeout,
+                  token_hash, user_id, now))
+            if not result:
                 return False
             
+            valid_until = min(now + self.validation_cache_ttl, result[0][0])
+            self._valid_sessions.put(token_hash, user_id, valid_until)
             return True
             
         except Exception as e:
@@ -145,22 +477,25 @@ class SessionManager:
             return False
     
     def update_session_activity(self, session_token):
-        """Update the last activity timestamp for a session."""
+        """
+        Update the last activity timestamp for a session.
+        
+        The Flask session copy is only rewritten once it is older than
+        activity_refresh_threshold, so most requests leave the signed cookie
+        untouched.
+        """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            self._execute_write('''
                 UPDATE user_sessions
-                SET last_activity = ?
-                WHERE session_token = ?
-            ''', (datetime.now(), session_token))
-            
-            conn.commit()
-            conn.close()
+                SET last_activity = strftime('%s', 'now'),
+                    expires_at = strftime('%s', 'now') + ?
+                WHERE token_hash = ?
+            ''', (self.session_timeout, self._hash_token(session_token)))
             
             # Update Flask session
-            session['last_activity'] = datetime.now().isoformat()
+            now = int(time.time())
+            if now - session.get('last_activity_epoch', 0) >= self.activity_refresh_threshold:
+                session['last_activity_epoch'] = now
             
         except Exception as e:
             logger.error(f"Error updating session activity: {e}")
@@ -168,66 +503,76 @@ class SessionManager:
     def invalidate_session(self, session_token):
         """Invalidate a specific session."""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                UPDATE user_sessions
-                SET is_active = FALSE
-                WHERE session_token = ?
-            ''', (session_token,))
-            
-            conn.commit()
-            conn.close()
-            
+            self._invalidate_token_hash(self._hash_token(session_token))
             logger.info(f"Session {session_token[:8]}... invalidated")
             
         except Exception as e:
             logger.error(f"Error invalidating session: {e}")
     
+    def _invalidate_token_hash(self, token_hash):
+        """Deactivate the session stored under token_hash."""
+        self._valid_sessions.discard(token_hash)
+        self._execute_write('''
+            UPDATE user_sessions
+            SET is_active = 0
+            WHERE token_hash = ?
+        ''', (token_hash,))
+    
     def invalidate_all_user_sessions(self, user_id):
         """Invalidate all sessions for a specific user."""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            self._valid_sessions.discard_user(user_id)
+            self._execute_write('''
                 UPDATE user_sessions
-                SET is_active = FALSE
+                SET is_active = 0
                 WHERE user_id = ?
             ''', (user_id,))
             
-            conn.commit()
-            conn.close()
-            
             logger.info(f"All sessions invalidated for user {user_id}")
             
         except Exception as e:
             logger.error(f"Error invalidating user sessions: {e}")
     
     def cleanup_expired_sessions(self, user_id=None):
-        """Clean up expired sessions."""
+        """
+        Clean up expired sessions.
+        
+        A full sweep deactivates expired sessions and deletes sessions that
+        expired more than session_retention ago, in batches of
+        cleanup_batch_size rows so no single write holds the lock for long.
+        """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cutoff_time = datetime.now() - self.session_timeout
+            now = int(time.time())
             
             if user_id:
-                cursor.execute('''
+                self._execute_write('''
                     UPDATE user_sessions
-                    SET is_active = FALSE
-                    WHERE user_id = ? AND last_activity < ?
-                ''', (user_id, cutoff_time))
-            else:
-                cursor.execute('''
-                    UPDATE user_sessions
-                    SET is_active = FALSE
-                    WHERE last_activity < ?
-                ''', (cutoff_time,))
+                    SET is_active = 0
+                    WHERE user_id = ? AND is_active = 1 AND expires_at < ?
+                ''', (user_id, now))
+                return
             
-            conn.commit()
-            conn.close()
+            expired = self._execute_write_batched('''
+                UPDATE user_sessions
+                SET is_active = 0
+                WHERE rowid IN (
+                    SELECT rowid FROM user_sessions
+                    WHERE is_active = 1 AND expires_at < ?
+                    LIMIT ?
+                )
+            ''', (now,))
+            
+            purged = self._execute_write_batched('''
+                DELETE FROM user_sessions
+                WHERE rowid IN (
+                    SELECT rowid FROM user_sessions
+                    WHERE expires_at < ?
+                    LIMIT ?
+                )
+            ''', (now - self.session_retention,))
+            
+            if expired or purged:
+                logger.info(f"Session sweep: {expired} expired, {purged} purged")
             
         except Exception as e:
             logger.error(f"Error cleaning up expired sessions: {e}")
@@ -235,17 +580,15 @@ class SessionManager:
     def get_active_session_count(self, user_id):
         """Get the number of active sessions for a user."""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            cursor = self._read_conn().cursor()
             
             cursor.execute('''
                 SELECT COUNT(*)
                 FROM user_sessions
-                WHERE user_id = ? AND is_active = TRUE
+                WHERE user_id = ? AND is_active = 1
             ''', (user_id,))
             
             count = cursor.fetchone()[0]
-            conn.close()
             
             return count
             
@@ -254,81 +597,109 @@ class SessionManager:
             return 0
     
     def invalidate_oldest_session(self, user_id):
-        """Invalidate the oldest active session for a user."""
+        """Invalidate the oldest active session for a user in a single UPDATE."""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT session_token
-                FROM user_sessions
-                WHERE user_id = ? AND is_active = TRUE
-                ORDER BY created_at ASC
-                LIMIT 1
+            result = self._execute_write('''
+                UPDATE user_sessions
+                SET is_active = 0
+                WHERE rowid = (
+                    SELECT rowid
+                    FROM user_sessions
+                    WHERE user_id = ? AND is_active = 1
+                    ORDER BY created_at ASC
+                    LIMIT 1
+                )
+                RETURNING token_hash
             ''', (user_id,))
             
-            result = cursor.fetchone()
             if result:
-                self.invalidate_session(result[0])
-            
-            conn.close()
+                self._valid_sessions.discard(result[0][0])
+                logger.info(f"Oldest session invalidated for user {user_id}")
             
         except Exception as e:
             logger.error(f"Error invalidating oldest session: {e}")
     
     def log_login_attempt(self, ip_address, username=None, success=False, user_agent=None):
-        """Log a login attempt for security monitoring."""
+        """
+        Log a login attempt for security monitoring.
+        
+        Failed attempts are written immediately so is_ip_blocked counts them
+        on the next request; successful ones are queued for the log writer.
+        """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO login_attempts (ip_address, username, success, user_agent)
-                VALUES (?, ?, ?, ?)
-            ''', (ip_address, username, success, user_agent))
-            
-            conn.commit()
-            conn.close()
+            row = (ip_address, username, int(success), user_agent, int(time.time()))
+            if success:
+                self._enqueue(self._attempt_q, row)
+            else:
+                self._execute_write(INSERT_LOGIN_ATTEMPT_SQL, row)
             
         except Exception as e:
             logger.error(f"Error logging login attempt: {e}")
     
     def is_ip_blocked(self, ip_address, max_attempts=5, time_window=timedelta(minutes=15)):
-        """Check if an IP address should be blocked due to failed login attempts."""
+        """
+        Check if an IP address should be blocked due to failed login attempts.
+        
+        Only login_attempts_recent is consulted, so time_window should not
+        exceed recent_attempts_window. The scan stops as soon as the
+        max_attempts-th failure is found instead of counting them all.
+        """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            cursor = self._read_conn().cursor()
             
-            cutoff_time = datetime.now() - time_window
+            cutoff_time = int(time.time() - time_window.total_seconds())
             
             cursor.execute('''
-                SELECT COUNT(*)
-                FROM login_attempts
-                WHERE ip_address = ? AND success = FALSE AND attempted_at > ?
-            ''', (ip_address, cutoff_time))
-            
-            failed_attempts = cursor.fetchone()[0]
-            conn.close()
+                SELECT EXISTS (
+                    SELECT 1
+                    FROM login_attempts_recent
+                    WHERE ip_address = ? AND success = 0 AND attempted_at > ?
+                    LIMIT 1 OFFSET ?
+                )
+            ''', (ip_address, cutoff_time, max_attempts - 1))
             
-            return failed_attempts >= max_attempts
+            return bool(cursor.fetchone()[0])
             
         except Exception as e:
             logger.error(f"Error checking IP block status: {e}")
             return False
     
-    def log_user_activity(self, user_id, action, resource=None, session_token=None, ip_address=None):
-        """Log user activity for audit purposes."""
+    def archive_login_attempts(self):
+        """Move login attempts older than recent_attempts_window into login_attempts."""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            cutoff = int(time.time()) - self.recent_attempts_window
+            
+            with self._write_lock:
+                conn = self._writer()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.execute('''
+                        INSERT INTO login_attempts (ip_address, username, success,
+                                                    attempted_at, user_agent)
+                        SELECT ip_address, username, success, attempted_at, user_agent
+                        FROM login_attempts_recent
+                        WHERE attempted_at < ?
+                    ''', (cutoff,))
+                    archived = conn.execute('''
+                        DELETE FROM login_attempts_recent WHERE attempted_at < ?
+                    ''', (cutoff,)).rowcount
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+            
+            if archived:
+                logger.info(f"Archived {archived} login attempts")
             
-            cursor.execute('''
-                INSERT INTO user_activity (user_id, session_token, action, resource, ip_address)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, session_token, action, resource, ip_address))
-            
-            conn.commit()
-            conn.close()
+        except Exception as e:
+            logger.error(f"Error archiving login attempts: {e}")
+    
+    def log_user_activity(self, user_id, action, resource=None, session_token=None, ip_address=None):
+        """Log user activity for audit purposes (queued, written in batches)."""
+        try:
+            token_hash = self._hash_token(session_token) if session_token else None
+            self._enqueue(self._activity_q,
+                          (user_id, token_hash, action, resource, ip_address, int(time.time())))
             
         except Exception as e:
             logger.error(f"Error logging user activity: {e}")
@@ -336,18 +707,16 @@ class SessionManager:
     def get_user_sessions(self, user_id):
         """Get all active sessions for a user."""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            cursor = self._read_conn().cursor()
             
             cursor.execute('''
-                SELECT session_token, ip_address, user_agent, created_at, last_activity
+                SELECT hex(token_hash), ip_address, user_agent, created_at, last_activity
                 FROM user_sessions
-                WHERE user_id = ? AND is_active = TRUE
+                WHERE user_id = ? AND is_active = 1
                 ORDER BY last_activity DESC
             ''', (user_id,))
             
             sessions = cursor.fetchall()
-            conn.close()
             
             return sessions
             
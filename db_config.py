@@ -0,0 +1,29 @@
+"""
+SQLite connection settings for Retail Inventory Tracker
+
+Shared by setup_database.py, the session manager and the warehouse
+controller so every connection to the inventory database is tuned alike.
+"""
+
+# Switches the file to write-ahead logging so readers never block the writer.
+# The mode is stored in the file, and a read-only connection can't set it.
+WAL_PRAGMA = 'PRAGMA journal_mode=WAL'
+
+# Per-connection settings: NORMAL sync (no fsync per commit), a 64 MB page
+# cache, in-memory temp storage, 256 MB of memory-mapped I/O, enforced
+# foreign keys and a 5 s wait on locked databases
+SQLITE_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA busy_timeout=5000',
+)
+
+def apply_pragmas(conn, read_only=False):
+    """Apply SQLITE_PRAGMAS to a new connection, and WAL unless it is read-only."""
+    if not read_only:
+        conn.execute(WAL_PRAGMA)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
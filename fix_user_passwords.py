@@ -1,62 +1,17 @@
 #!/usr/bin/env python3
+import argparse
 import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from werkzeug.security import generate_password_hash
 
-# Minimal, clean script: update seeded users' password_hash fields to
-# Werkzeug's generate_password_hash output so Flask's check_password_hash
-# will validate the intended plaintext passwords.
-
-DB = Path(__file__).resolve().parent / 'database' / 'inventory.db'
-
-PASSWORDS = {
-    'admin': 'admin123',
-    'manager': 'manager123',
-    'employee': 'employee123',
-    'john_doe': 'password123',
-    'jane_smith': 'password123'
-}
-
-
-def main():
-    if not DB.exists():
-        print(f"Database not found at {DB}")
-        sys.exit(1)
-
-    conn = sqlite3.connect(str(DB))
-    cur = conn.cursor()
-
-    updated = []
-    for username, plain in PASSWORDS.items():
-        cur.execute("SELECT id FROM users WHERE username = ?", (username,))
-        if cur.fetchone():
-            cur.execute(
-                "UPDATE users SET password_hash = ? WHERE username = ?",
-                (generate_password_hash(plain), username),
-            )
-            updated.append(username)
-
-    conn.commit()
-    conn.close()
-
-    if updated:
-        print('Updated password hashes for: ' + ', '.join(updated))
-    else:
-        print('No matching users found to update.')
-
-
-if __name__ == '__main__':
-    main()
-#!/usr/bin/env python3
-import sqlite3
-import sys
-from pathlib import Path
-from werkzeug.security import generate_password_hash
+from seed_data import PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH
 
 # Minimal, clean script: update seeded users' password_hash fields to
 # Werkzeug's generate_password_hash output so Flask's check_password_hash
 # will validate the intended plaintext passwords.
+# fix_user_passwords_clean.py is kept as an alias for this script.
 
 DB = Path(__file__).resolve().parent / 'database' / 'inventory.db'
 
@@ -69,196 +24,52 @@ PASSWORDS = {
 }
 
 
-def main():
-    if not DB.exists():
-        print(f"Database not found at {DB}")
-        sys.exit(1)
-
-    conn = sqlite3.connect(str(DB))
-    cur = conn.cursor()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Reset seeded users' passwords to their default values.")
+    parser.add_argument('--db', type=Path, default=DB,
+                        help=f'path to the SQLite database (default: {DB})')
+    parser.add_argument('users', nargs='*', metavar='USER',
+                        help='seeded usernames to reset (default: all of them)')
+    args = parser.parse_args(argv)
 
-    updated = []
-    for username, plain in PASSWORDS.items():
-        cur.execute("SELECT id FROM users WHERE username = ?", (username,))
-        if cur.fetchone():
-            cur.execute(
-                "UPDATE users SET password_hash = ? WHERE username = ?",
-                (generate_password_hash(plain), username),
-            )
-            updated.append(username)
-
-    conn.commit()
-    conn.close()
+    unknown = [user for user in args.users if user not in PASSWORDS]
+    if unknown:
+        parser.error(f"not a seeded user: {', '.join(unknown)}")
+    return args
 
-    if updated:
-        print('Updated password hashes for: ' + ', '.join(updated))
-    else:
-        print('No matching users found to update.')
-
-
-if __name__ == '__main__':
-    main()
-#!/usr/bin/env python3
-import sqlite3
-import sys
-from pathlib import Path
-from werkzeug.security import generate_password_hash
 
-# Update seeded user password hashes to Werkzeug format so Flask's
-# check_password_hash will validate the intended plaintext credentials.
+def main(argv=None):
+    args = parse_args(argv)
+    db = args.db
+    passwords = {user: PASSWORDS[user] for user in args.users or PASSWORDS}
 
-DB = Path(__file__).resolve().parent / 'database' / 'inventory.db'
-
-PASSWORDS = {
-    'admin': 'admin123',
-    'manager': 'manager123',
-    'employee': 'employee123',
-    'john_doe': 'password123',
-    'jane_smith': 'password123'
-}
-
-
-def main():
-    if not DB.exists():
-        print(f"Database not found at {DB}")
+    if not db.exists():
+        print(f"Database not found at {db}")
         sys.exit(1)
 
-    conn = sqlite3.connect(str(DB))
-    cur = conn.cursor()
-
-    updated = []
-    for username, plain in PASSWORDS.items():
-        cur.execute('SELECT id FROM users WHERE username = ?', (username,))
-        if cur.fetchone():
-            cur.execute(
-                'UPDATE users SET password_hash = ? WHERE username = ?',
-                (generate_password_hash(plain), username)
-            )
-            updated.append(username)
+    # Imported here so importing this module doesn't load Werkzeug
+    from werkzeug.security import generate_password_hash
 
-    conn.commit()
-    conn.close()
+    # Hash up front (in parallel, hashing is CPU-bound) so the write
+    # transaction only covers the UPDATEs
+    hash_password = partial(generate_password_hash, method=PASSWORD_HASH_METHOD,
+                            salt_length=PASSWORD_SALT_LENGTH)
+    with ProcessPoolExecutor() as executor:
+        hashes = list(executor.map(hash_password, passwords.values()))
+    rows = list(zip(hashes, passwords))
 
-    if updated:
-        print('Updated password hashes for: ' + ', '.join(updated))
-    else:
-        print('No matching users found to update.')
-
-
-if __name__ == '__main__':
-    main()
-#!/usr/bin/env python3
-import sqlite3
-import sys
-from pathlib import Path
-from werkzeug.security import generate_password_hash
-
-# Clean, minimal script to update seeded user password hashes to Werkzeug format.
-# This ensures the Flask app's check_password_hash will validate the intended
-# plaintext credentials created by setup_database.py.
-
-DB = Path(__file__).resolve().parent / 'database' / 'inventory.db'
-
-PASSWORDS = {
-    'admin': 'admin123',
-    'manager': 'manager123',
-    'employee': 'employee123',
-    'john_doe': 'password123',
-    'jane_smith': 'password123'
-}
-
-
-def main():
-    if not DB.exists():
-        print(f"Database not found at {DB}")
-        sys.exit(1)
-
-    conn = sqlite3.connect(str(DB))
-    cur = conn.cursor()
-
-    updated = []
-    for username, plain in PASSWORDS.items():
-        cur.execute('SELECT id FROM users WHERE username = ?', (username,))
-        if cur.fetchone():
-            cur.execute('UPDATE users SET password_hash = ? WHERE username = ?',
-                        (generate_password_hash(plain), username))
-            updated.append(username)
-
-    conn.commit()
-    conn.close()
-
-    if updated:
-        print('Updated password hashes for: ' + ', '.join(updated))
-    else:
-        print('No matching users found to update.')
-
-
-if __name__ == '__main__':
-    main()
-"""
-Script to re-hash seeded user passwords in the SQLite database using Werkzeug
-so the app's `check_password_hash` will validate them correctly.
-"""
-This will update the users created by `setup_database.py` (admin, manager, employee, john_doe, jane_smith)
-with Werkzeug's `generate_password_hash` output for the known plaintext passwords.
-
-Run this with the project's virtualenv python:
-& "C:\Users\HP\Desktop\ajdbs hqwkyg\.venv-1\Scripts\python.exe" fix_user_passwords.py
-"""
-
-import sqlite3
-from werkzeug.security import generate_password_hash
-
-DB_PATH = 'database/inventory.db'
-# Mapping of username -> plaintext password that was originally intended
-PASSWORDS = {
-    'admin': 'admin123',
-    'jane_smith': 'password123'
-}
-
-"""fix_user_passwords.py
-
-Update seeded users' password_hash fields to Werkzeug-compatible hashes so
-the Flask login (check_password_hash) will validate the known plaintext
-credentials.
-
-Run from the project directory using the project's venv:
-& "C:\Users\HP\Desktop\ajdbs hqwkyg\.venv-1\Scripts\python.exe" fix_user_passwords.py
-"""
-
-import sqlite3
-from werkzeug.security import generate_password_hash
-from pathlib import Path
-
-
-DB_PATH = Path(__file__).resolve().parent / 'database' / 'inventory.db'
-
-PASSWORDS = {
-    'admin': 'admin123',
-    'manager': 'manager123',
-    'employee': 'employee123',
-    'john_doe': 'password123',
-    'jane_smith': 'password123'
-}
-
-
-def main():
-    if not DB_PATH.exists():
-        print(f"Database not found at {DB_PATH}")
-        return
-
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(str(db), isolation_level=None)
     cur = conn.cursor()
 
-    updated = []
-    for username, plain in PASSWORDS.items():
-        cur.execute('SELECT id FROM users WHERE username = ?', (username,))
-        if cur.fetchone():
-            cur.execute('UPDATE users SET password_hash = ? WHERE username = ?',
-                        (generate_password_hash(plain), username))
-            updated.append(username)
+    cur.execute('BEGIN')
+    cur.executemany("UPDATE users SET password_hash = ? WHERE username = ?", rows)
+    cur.execute('COMMIT')
 
-    conn.commit()
+    placeholders = ','.join('?' * len(passwords))
+    cur.execute(f"SELECT username FROM users WHERE username IN ({placeholders})",
+                tuple(passwords))
+    updated = [row[0] for row in cur.fetchall()]
     conn.close()
 
     if updated:
@@ -269,6 +80,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-        if updated:
-
-            print(f"Updated password hashes for: {', '.join(updated)}")
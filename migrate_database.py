@@ -1,16 +1,82 @@
 #!/usr/bin/env python3
 """
-Database migration script to add reorder_level column to products table.
+Database migration script to add reorder_level column to products table
+and a non-negative CHECK on inventory.quantity.
 Run this script if you're getting operational errors related to missing reorder_level column.
 """
 
 import sqlite3
 import os
+import sys
 
 DATABASE_PATH = 'database/inventory.db'
 
-def migrate_database():
-    """Add reorder_level column to products table if it doesn't exist."""
+# Inventory layout with the quantity CHECK; SQLite can't add a CHECK to an
+# existing table, so the table is rebuilt from this definition
+INVENTORY_TABLE_SQL = '''
+    CREATE TABLE inventory_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL,
+        warehouse_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL DEFAULT 0 CHECK (quantity >= 0),
+        reserved_quantity INTEGER NOT NULL DEFAULT 0,
+        reorder_level INTEGER NOT NULL DEFAULT 10,
+        max_stock_level INTEGER NOT NULL DEFAULT 1000,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (product_id) REFERENCES products(id),
+        FOREIGN KEY (warehouse_id) REFERENCES warehouses(id),
+        UNIQUE(product_id, warehouse_id)
+    )
+'''
+INVENTORY_COLUMNS = ('id, product_id, warehouse_id, quantity, reserved_quantity, '
+                     'reorder_level, max_stock_level, last_updated')
+
+def add_inventory_quantity_check(conn):
+    """Rebuild the inventory table with CHECK (quantity >= 0) if it lacks one."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'inventory'")
+    table = cursor.fetchone()
+    if table is None or 'quantity >= 0' in table[0]:
+        return False
+    
+    # Indexes and triggers go away with the old table; keep their DDL to recreate them.
+    # idx_inventory_product_warehouse is left out: the new table's UNIQUE key covers it.
+    cursor.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name = 'inventory' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+          AND name != 'idx_inventory_product_warehouse'
+    ''')
+    dependents = [row[0] for row in cursor.fetchall()]
+    
+    # The table swap needs foreign keys off, and that only takes effect outside a transaction
+    cursor.execute('PRAGMA foreign_keys=OFF')
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute(INVENTORY_TABLE_SQL)
+        # Rows with negative stock fail the CHECK here and abort the rebuild. Of
+        # duplicate rows for one product and warehouse, the latest written is kept.
+        cursor.execute(f'''
+            INSERT INTO inventory_new ({INVENTORY_COLUMNS})
+            SELECT {INVENTORY_COLUMNS} FROM inventory
+            WHERE id IN (SELECT MAX(id) FROM inventory GROUP BY product_id, warehouse_id)
+        ''')
+        cursor.execute('DROP TABLE inventory')
+        cursor.execute('ALTER TABLE inventory_new RENAME TO inventory')
+        for statement in dependents:
+            cursor.execute(statement)
+        cursor.execute('PRAGMA foreign_key_check(inventory)')
+        if cursor.fetchall():
+            raise sqlite3.IntegrityError('inventory rows reference missing products or warehouses')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute('PRAGMA foreign_keys=ON')
+    return True
+
+def migrate_database(verbose=False):
+    """Add reorder_level to products and the quantity CHECK to inventory if missing."""
     
     if not os.path.exists(DATABASE_PATH):
         print("Database not found. Please run the main application first to create it.")
@@ -21,10 +87,10 @@ def migrate_database():
     
     try:
         # Check if reorder_level column exists
-        cursor.execute("PRAGMA table_info(products)")
-        columns = [column[1] for column in cursor.fetchall()]
+        cursor.execute("SELECT 1 FROM pragma_table_info('products') WHERE name = ? LIMIT 1",
+                       ('reorder_level',))
         
-        if 'reorder_level' not in columns:
+        if cursor.fetchone() is None:
             print("Adding reorder_level column to products table...")
             cursor.execute("ALTER TABLE products ADD COLUMN reorder_level INTEGER DEFAULT 10")
             conn.commit()
@@ -32,10 +98,15 @@ def migrate_database():
         else:
             print("✅ reorder_level column already exists in products table.")
         
-        # Verify the column was added
-        cursor.execute("PRAGMA table_info(products)")
-        columns = [column[1] for column in cursor.fetchall()]
-        print(f"Products table columns: {columns}")
+        if add_inventory_quantity_check(conn):
+            print("✅ Added non-negative quantity check to inventory table!")
+        else:
+            print("✅ inventory table already checks for non-negative quantity.")
+        
+        if verbose:
+            cursor.execute("SELECT name FROM pragma_table_info('products')")
+            columns = [column[0] for column in cursor.fetchall()]
+            print(f"Products table columns: {columns}")
         
     except sqlite3.Error as e:
         print(f"❌ Database error: {e}")
@@ -45,4 +116,4 @@ def migrate_database():
         conn.close()
 
 if __name__ == '__main__':
-    migrate_database()
\ No newline at end of file
+    migrate_database(verbose='--verbose' in sys.argv[1:])
\ No newline at end of file
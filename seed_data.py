@@ -0,0 +1,89 @@
+"""
+Sample data for setup_database.py.
+
+Kept in an importable module so Python caches the parsed literals as
+bytecode; setup_database.py is usually run as a script, which is
+recompiled from source on every run.
+"""
+
+# Password hash settings for the seeded users, shared by setup_database.py and
+# fix_user_passwords.py. Pinned instead of Werkzeug's version-dependent default
+# (pbkdf2 at 600000 iterations on 2.3, scrypt on 3.x); these are well-known seed
+# passwords, so a cheaper hash costs nothing, and check_password_hash reads the
+# method from the stored hash either way.
+PASSWORD_HASH_METHOD = 'pbkdf2:sha256:260000'
+PASSWORD_SALT_LENGTH = 16
+
+# Users: (username, plaintext password, email, full name, role).
+# Passwords are hashed by setup_database.hash_password before insert.
+USERS = [
+    ('admin', 'admin123', 'admin@retailtracker.com', 'System Administrator', 'admin'),
+    ('manager', 'manager123', 'manager@retailtracker.com', 'Store Manager', 'manager'),
+    ('employee', 'employee123', 'employee@retailtracker.com', 'Store Employee', 'employee'),
+    ('john_doe', 'password123', 'john@retailtracker.com', 'John Doe', 'manager'),
+    ('jane_smith', 'password123', 'jane@retailtracker.com', 'Jane Smith', 'employee')
+]
+
+# Suppliers: (name, contact person, email, phone, address)
+SUPPLIERS = [
+    ('TechCorp Solutions', 'Mike Johnson', 'mike@techcorp.com', '+1-555-0101', '123 Tech Street, Silicon Valley, CA'),
+    ('Fashion Forward Ltd', 'Sarah Wilson', 'sarah@fashionforward.com', '+1-555-0102', '456 Fashion Ave, New York, NY'),
+    ('Home Essentials Co', 'Robert Brown', 'robert@homeessentials.com', '+1-555-0103', '789 Home Blvd, Chicago, IL'),
+    ('Sports Gear Inc', 'Lisa Davis', 'lisa@sportsgear.com', '+1-555-0104', '321 Sports Lane, Denver, CO'),
+    ('BookWorld Publishers', 'David Garcia', 'david@bookworld.com', '+1-555-0105', '654 Book Street, Boston, MA')
+]
+
+# Warehouses: (name, location, capacity, manager user id)
+WAREHOUSES = [
+    ('Main Warehouse', 'New York, NY - 123 Main St', 50000, 2),
+    ('West Coast Hub', 'Los Angeles, CA - 456 West Ave', 35000, 4),
+    ('Central Distribution', 'Chicago, IL - 789 Central Blvd', 40000, 2),
+    ('East Coast Facility', 'Boston, MA - 321 East Road', 30000, 4)
+]
+
+# Products: (name, category, sku, barcode, description, unit price, cost price, supplier id)
+PRODUCTS = [
+    # Electronics
+    ('Laptop Pro 15"', 'Electronics', 'LAPTOP-PRO-15', '123456789012', 'High-performance laptop for professionals', 1299.99, 899.99, 1),
+    ('Smartphone X', 'Electronics', 'PHONE-X-128', '123456789013', 'Latest smartphone with advanced features', 899.99, 649.99, 1),
+    ('Wireless Headphones', 'Electronics', 'HEADPHONE-WL-01', '123456789014', 'Premium wireless headphones with noise cancellation', 199.99, 129.99, 1),
+    ('Tablet Air 11"', 'Electronics', 'TABLET-AIR-11', '123456789015', 'Lightweight tablet for productivity and entertainment', 599.99, 429.99, 1),
+    ('Smart Watch Series 5', 'Electronics', 'WATCH-SMART-5', '123456789016', 'Advanced fitness and connectivity features', 399.99, 279.99, 1),
+    
+    # Clothing
+    ('Cotton T-Shirt', 'Clothing', 'TSHIRT-COT-M', '234567890123', 'Comfortable cotton t-shirt in medium size', 19.99, 8.99, 2),
+    ('Denim Jeans', 'Clothing', 'JEANS-DENIM-32', '234567890124', 'Classic denim jeans, waist size 32', 59.99, 29.99, 2),
+    ('Running Shoes', 'Clothing', 'SHOES-RUN-42', '234567890125', 'Professional running shoes, size 42', 129.99, 79.99, 2),
+    ('Winter Jacket', 'Clothing', 'JACKET-WINTER-L', '234567890126', 'Warm winter jacket, large size', 199.99, 119.99, 2),
+    ('Baseball Cap', 'Clothing', 'CAP-BASEBALL-BLK', '234567890127', 'Classic black baseball cap', 24.99, 12.99, 2),
+    
+    # Home & Garden
+    ('Coffee Maker Deluxe', 'Home & Garden', 'COFFEE-DELUXE-01', '345678901234', '12-cup programmable coffee maker', 89.99, 54.99, 3),
+    ('Garden Tool Set', 'Home & Garden', 'GARDEN-TOOLS-SET', '345678901235', 'Complete 10-piece garden tool set', 149.99, 89.99, 3),
+    ('LED Desk Lamp', 'Home & Garden', 'LAMP-LED-DESK', '345678901236', 'Adjustable LED desk lamp with USB charging', 49.99, 29.99, 3),
+    ('Throw Pillow Set', 'Home & Garden', 'PILLOW-THROW-4PC', '345678901237', 'Set of 4 decorative throw pillows', 79.99, 39.99, 3),
+    ('Kitchen Scale Digital', 'Home & Garden', 'SCALE-KITCHEN-DIG', '345678901238', 'Precision digital kitchen scale', 34.99, 19.99, 3),
+    
+    # Sports & Recreation
+    ('Basketball Official', 'Sports & Recreation', 'BALL-BASKETBALL', '456789012345', 'Official size basketball', 29.99, 17.99, 4),
+    ('Yoga Mat Premium', 'Sports & Recreation', 'MAT-YOGA-PREM', '456789012346', 'Extra-thick premium yoga mat', 79.99, 49.99, 4),
+    ('Tennis Racket Pro', 'Sports & Recreation', 'RACKET-TENNIS-PRO', '456789012347', 'Professional tennis racket', 199.99, 129.99, 4),
+    ('Dumbbell Set 20kg', 'Sports & Recreation', 'DUMBBELL-20KG-SET', '456789012348', 'Adjustable dumbbell set up to 20kg', 299.99, 199.99, 4),
+    ('Camping Tent 4-Person', 'Sports & Recreation', 'TENT-CAMPING-4P', '456789012349', 'Waterproof camping tent for 4 people', 249.99, 169.99, 4),
+    
+    # Books & Media
+    ('Programming Guide Python', 'Books & Media', 'BOOK-PYTHON-GUIDE', '567890123456', 'Complete guide to Python programming', 49.99, 24.99, 5),
+    ('Mystery Novel Bestseller', 'Books & Media', 'BOOK-MYSTERY-01', '567890123457', 'Thrilling mystery novel by acclaimed author', 14.99, 7.99, 5),
+    ('Cookbook Italian Cuisine', 'Books & Media', 'BOOK-COOK-ITALIAN', '567890123458', 'Authentic Italian recipes cookbook', 34.99, 19.99, 5),
+    ('History of Technology', 'Books & Media', 'BOOK-HIST-TECH', '567890123459', 'Comprehensive history of technological advancement', 39.99, 24.99, 5),
+    ('Art Photography Book', 'Books & Media', 'BOOK-ART-PHOTO', '567890123460', 'Beautiful collection of contemporary photography', 59.99, 34.99, 5)
+]
+
+# Alerts: (alert type, product id, warehouse id, message, severity)
+ALERTS = [
+    ('LOW_STOCK', 1, 1, 'Laptop Pro 15" is running low in Main Warehouse (15 units remaining)', 'medium'),
+    ('OUT_OF_STOCK', 5, 2, 'Smart Watch Series 5 is out of stock in West Coast Hub', 'high'),
+    ('REORDER_POINT', 10, 3, 'Dumbbell Set 20kg has reached reorder point in Central Distribution', 'medium'),
+    ('HIGH_DEMAND', 3, 1, 'Wireless Headphones showing unusual high demand pattern', 'low'),
+    ('SYSTEM', None, None, 'Daily inventory sync completed successfully', 'low')
+]
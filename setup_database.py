@@ -7,13 +7,94 @@ and populates them with sample data for testing and demonstration.
 
 import sqlite3
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import hashlib
-import random
+import numpy as np
+from werkzeug.security import generate_password_hash
+from db_config import apply_pragmas
+from auth.session_manager import SESSION_TABLES_DDL, SESSION_INDEX_DDL, SESSION_DATA_VERSION
+
+# Every table this script (or the app's session manager and warehouse
+# controller) creates, children before parents so the drops never trip a
+# foreign key
+SEED_TABLES = (
+    'warehouse_stats', 'user_activity', 'login_attempts_recent', 'login_attempts', 'user_sessions',
+    'alerts', 'stock_movements', 'inventory', 'warehouses', 'products',
+    'suppliers', 'users'
+)
+
+# Indexes created after the bulk load, inside the seeding transaction
+INDEX_DDL = (
+    'CREATE INDEX idx_inv_wh_prod ON inventory(warehouse_id, product_id)',
+    'CREATE INDEX idx_stock_movements_product ON stock_movements(product_id)',
+    'CREATE INDEX idx_sm_wh_created ON stock_movements(warehouse_id, created_at DESC)',
+    'CREATE INDEX idx_sm_ref ON stock_movements(reference_number)',
+    'CREATE INDEX idx_stock_movements_date ON stock_movements(created_at)',
+    'CREATE INDEX idx_sm_type_date ON stock_movements(movement_type, created_at DESC)',
+    'CREATE INDEX idx_products_sku ON products(sku)',
+    'CREATE INDEX idx_products_category ON products(category)',
+    'CREATE INDEX idx_alerts_unread ON alerts(is_read)',
+    'CREATE INDEX idx_users_username ON users(username)',
+)
+
+# Seed INSERT statements, shared so other modules can reuse them verbatim
+# (the connection's statement cache then skips re-parsing them)
+INSERT_USERS_SQL = '''
+    INSERT INTO users (username, password_hash, email, full_name, role)
+    VALUES (?, ?, ?, ?, ?)
+'''
+INSERT_SUPPLIERS_SQL = '''
+    INSERT INTO suppliers (name, contact_person, email, phone, address)
+    VALUES (?, ?, ?, ?, ?)
+'''
+INSERT_WAREHOUSES_SQL = '''
+    INSERT INTO warehouses (name, location, capacity, manager_id)
+    VALUES (?, ?, ?, ?)
+'''
+INSERT_PRODUCTS_SQL = '''
+    INSERT INTO products (name, category, sku, barcode, description, unit_price, cost_price, supplier_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_INVENTORY_SQL = '''
+    INSERT INTO inventory (product_id, warehouse_id, quantity, reserved_quantity,
+                           reorder_level, max_stock_level)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+INSERT_MOVEMENTS_SQL = '''
+    INSERT INTO stock_movements (product_id, warehouse_id, movement_type,
+                                 quantity, reference_number, notes, user_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_DATED_MOVEMENTS_SQL = '''
+    INSERT INTO stock_movements (product_id, warehouse_id, movement_type,
+                                 quantity, reference_number, notes, user_id, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_ALERTS_SQL = '''
+    INSERT INTO alerts (alert_type, product_id, warehouse_id, message, severity)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Column layout of the generated inventory rows, in INSERT order
+INVENTORY_DTYPE = np.dtype([
+    ('product_id', 'i4'), ('warehouse_id', 'i4'), ('quantity', 'i4'),
+    ('reserved_quantity', 'i4'), ('reorder_level', 'i4'), ('max_stock_level', 'i4')
+])
+
+# Stock movement reference numbers: <TYPE>-<YYYYMMDD>-<sequence>
+REFERENCE_NUMBER = '{0}-{1}-{2:04d}'
 
 def hash_password(password):
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password with a per-user salt, in the format app.py's login checks."""
+    import seed_data  # Loaded lazily, like the rest of the seed literals
+    return generate_password_hash(password, method=seed_data.PASSWORD_HASH_METHOD,
+                                  salt_length=seed_data.PASSWORD_SALT_LENGTH)
+
+def multi_insert(cursor, insert_sql, rows):
+    """Insert a handful of rows by repeating insert_sql's VALUES tuple in one statement."""
+    head, row_tpl = insert_sql.rsplit('VALUES', 1)
+    cursor.execute(f"{head}VALUES {', '.join([row_tpl.strip()] * len(rows))}",
+                   [value for row in rows for value in row])
 
 def create_database():
     """Create database directory and initialize database with tables and sample data."""
@@ -25,16 +106,36 @@ def create_database():
     
     database_path = os.path.join(database_dir, 'inventory.db')
     
-    # Remove existing database for fresh start
-    if os.path.exists(database_path):
-        os.remove(database_path)
-        print(f"Removed existing database: {database_path}")
+    reseeding = os.path.exists(database_path)
     
-    # Create new database connection
-    conn = sqlite3.connect(database_path)
+    # Open (or create) the database; an existing file is reset by dropping
+    # its tables below, which keeps its WAL setting and any open readers.
+    # With isolation_level=None sqlite3 never begins or commits on its own,
+    # so the schema, seed load and index build share the one BEGIN IMMEDIATE.
+    conn = sqlite3.connect(database_path, isolation_level=None, cached_statements=256)
     cursor = conn.cursor()
     
+    # File layout must be chosen before the first page is written (the WAL
+    # switch below writes it): 8 KB pages for shallower B-trees, and
+    # incremental auto-vacuum so re-seeds can hand pages back to the OS.
+    # On an existing file only auto_vacuum applies, via the VACUUM after a re-seed.
+    cursor.execute('PRAGMA page_size=8192')
+    cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    apply_pragmas(conn)
+    
+    # Foreign keys are verified once with foreign_key_check before commit
+    # instead of per inserted row (the pragma is ignored inside a transaction)
+    cursor.execute('PRAGMA foreign_keys=OFF')
+    
     try:
+        cursor.execute('BEGIN IMMEDIATE')
+        
+        # Drop existing tables for fresh start
+        if reseeding:
+            for table in SEED_TABLES:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+            print(f"Dropped existing tables in: {database_path}")
+        
         print("Creating database tables...")
         
         # Create Users table
@@ -77,6 +178,7 @@ def create_database():
                 unit_price DECIMAL(10,2) NOT NULL,
                 cost_price DECIMAL(10,2),
                 supplier_id INTEGER,
+                reorder_level INTEGER DEFAULT 10,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (supplier_id) REFERENCES suppliers(id)
@@ -102,7 +204,7 @@ def create_database():
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 product_id INTEGER NOT NULL,
                 warehouse_id INTEGER NOT NULL,
-                quantity INTEGER NOT NULL DEFAULT 0,
+                quantity INTEGER NOT NULL DEFAULT 0 CHECK (quantity >= 0),
                 reserved_quantity INTEGER NOT NULL DEFAULT 0,
                 reorder_level INTEGER NOT NULL DEFAULT 10,
                 max_stock_level INTEGER NOT NULL DEFAULT 1000,
@@ -149,250 +251,172 @@ def create_database():
             )
         ''')
         
-        # Create Sessions table
-        cursor.execute('''
-            CREATE TABLE user_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                session_token VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL,
-                is_active BOOLEAN DEFAULT 1,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
+        # Session, login attempt and activity tables in the session manager's layout,
+        # already at its data version so it has nothing to convert
+        for statement in SESSION_TABLES_DDL + SESSION_INDEX_DDL:
+            cursor.execute(statement)
+        cursor.execute(f'PRAGMA user_version = {SESSION_DATA_VERSION}')
         
         print("✅ Database tables created successfully")
         
-        # Insert sample data
+        # Insert sample data (the literals live in seed_data.py, which is
+        # imported here so its cached bytecode is only loaded when seeding)
         print("Inserting sample data...")
+        import seed_data
         
         # Insert Users
+        users = seed_data.USERS
+        # Hash all passwords concurrently; the KDF releases the GIL
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            password_hashes = list(executor.map(hash_password, [user[1] for user in users]))
+        
         users_data = [
-            ('admin', hash_password('admin123'), 'admin@retailtracker.com', 'System Administrator', 'admin'),
-            ('manager', hash_password('manager123'), 'manager@retailtracker.com', 'Store Manager', 'manager'),
-            ('employee', hash_password('employee123'), 'employee@retailtracker.com', 'Store Employee', 'employee'),
-            ('john_doe', hash_password('password123'), 'john@retailtracker.com', 'John Doe', 'manager'),
-            ('jane_smith', hash_password('password123'), 'jane@retailtracker.com', 'Jane Smith', 'employee')
+            (username, password_hash, email, full_name, role)
+            for (username, _, email, full_name, role), password_hash in zip(users, password_hashes)
         ]
         
-        cursor.executemany('''
-            INSERT INTO users (username, password_hash, email, full_name, role)
-            VALUES (?, ?, ?, ?, ?)
-        ''', users_data)
+        multi_insert(cursor, INSERT_USERS_SQL, users_data)
         
         # Insert Suppliers
-        suppliers_data = [
-            ('TechCorp Solutions', 'Mike Johnson', 'mike@techcorp.com', '+1-555-0101', '123 Tech Street, Silicon Valley, CA'),
-            ('Fashion Forward Ltd', 'Sarah Wilson', 'sarah@fashionforward.com', '+1-555-0102', '456 Fashion Ave, New York, NY'),
-            ('Home Essentials Co', 'Robert Brown', 'robert@homeessentials.com', '+1-555-0103', '789 Home Blvd, Chicago, IL'),
-            ('Sports Gear Inc', 'Lisa Davis', 'lisa@sportsgear.com', '+1-555-0104', '321 Sports Lane, Denver, CO'),
-            ('BookWorld Publishers', 'David Garcia', 'david@bookworld.com', '+1-555-0105', '654 Book Street, Boston, MA')
-        ]
-        
-        cursor.executemany('''
-            INSERT INTO suppliers (name, contact_person, email, phone, address)
-            VALUES (?, ?, ?, ?, ?)
-        ''', suppliers_data)
+        suppliers_data = seed_data.SUPPLIERS
+        multi_insert(cursor, INSERT_SUPPLIERS_SQL, suppliers_data)
         
         # Insert Warehouses
-        warehouses_data = [
-            ('Main Warehouse', 'New York, NY - 123 Main St', 50000, 2),
-            ('West Coast Hub', 'Los Angeles, CA - 456 West Ave', 35000, 4),
-            ('Central Distribution', 'Chicago, IL - 789 Central Blvd', 40000, 2),
-            ('East Coast Facility', 'Boston, MA - 321 East Road', 30000, 4)
-        ]
-        
-        cursor.executemany('''
-            INSERT INTO warehouses (name, location, capacity, manager_id)
-            VALUES (?, ?, ?, ?)
-        ''', warehouses_data)
+        warehouses_data = seed_data.WAREHOUSES
+        multi_insert(cursor, INSERT_WAREHOUSES_SQL, warehouses_data)
         
         # Insert Products
-        products_data = [
-            # Electronics
-            ('Laptop Pro 15"', 'Electronics', 'LAPTOP-PRO-15', '123456789012', 'High-performance laptop for professionals', 1299.99, 899.99, 1),
-            ('Smartphone X', 'Electronics', 'PHONE-X-128', '123456789013', 'Latest smartphone with advanced features', 899.99, 649.99, 1),
-            ('Wireless Headphones', 'Electronics', 'HEADPHONE-WL-01', '123456789014', 'Premium wireless headphones with noise cancellation', 199.99, 129.99, 1),
-            ('Tablet Air 11"', 'Electronics', 'TABLET-AIR-11', '123456789015', 'Lightweight tablet for productivity and entertainment', 599.99, 429.99, 1),
-            ('Smart Watch Series 5', 'Electronics', 'WATCH-SMART-5', '123456789016', 'Advanced fitness and connectivity features', 399.99, 279.99, 1),
-            
-            # Clothing
-            ('Cotton T-Shirt', 'Clothing', 'TSHIRT-COT-M', '234567890123', 'Comfortable cotton t-shirt in medium size', 19.99, 8.99, 2),
-            ('Denim Jeans', 'Clothing', 'JEANS-DENIM-32', '234567890124', 'Classic denim jeans, waist size 32', 59.99, 29.99, 2),
-            ('Running Shoes', 'Clothing', 'SHOES-RUN-42', '234567890125', 'Professional running shoes, size 42', 129.99, 79.99, 2),
-            ('Winter Jacket', 'Clothing', 'JACKET-WINTER-L', '234567890126', 'Warm winter jacket, large size', 199.99, 119.99, 2),
-            ('Baseball Cap', 'Clothing', 'CAP-BASEBALL-BLK', '234567890127', 'Classic black baseball cap', 24.99, 12.99, 2),
-            
-            # Home & Garden
-            ('Coffee Maker Deluxe', 'Home & Garden', 'COFFEE-DELUXE-01', '345678901234', '12-cup programmable coffee maker', 89.99, 54.99, 3),
-            ('Garden Tool Set', 'Home & Garden', 'GARDEN-TOOLS-SET', '345678901235', 'Complete 10-piece garden tool set', 149.99, 89.99, 3),
-            ('LED Desk Lamp', 'Home & Garden', 'LAMP-LED-DESK', '345678901236', 'Adjustable LED desk lamp with USB charging', 49.99, 29.99, 3),
-            ('Throw Pillow Set', 'Home & Garden', 'PILLOW-THROW-4PC', '345678901237', 'Set of 4 decorative throw pillows', 79.99, 39.99, 3),
-            ('Kitchen Scale Digital', 'Home & Garden', 'SCALE-KITCHEN-DIG', '345678901238', 'Precision digital kitchen scale', 34.99, 19.99, 3),
-            
-            # Sports & Recreation
-            ('Basketball Official', 'Sports & Recreation', 'BALL-BASKETBALL', '456789012345', 'Official size basketball', 29.99, 17.99, 4),
-            ('Yoga Mat Premium', 'Sports & Recreation', 'MAT-YOGA-PREM', '456789012346', 'Extra-thick premium yoga mat', 79.99, 49.99, 4),
-            ('Tennis Racket Pro', 'Sports & Recreation', 'RACKET-TENNIS-PRO', '456789012347', 'Professional tennis racket', 199.99, 129.99, 4),
-            ('Dumbbell Set 20kg', 'Sports & Recreation', 'DUMBBELL-20KG-SET', '456789012348', 'Adjustable dumbbell set up to 20kg', 299.99, 199.99, 4),
-            ('Camping Tent 4-Person', 'Sports & Recreation', 'TENT-CAMPING-4P', '456789012349', 'Waterproof camping tent for 4 people', 249.99, 169.99, 4),
-            
-            # Books & Media
-            ('Programming Guide Python', 'Books & Media', 'BOOK-PYTHON-GUIDE', '567890123456', 'Complete guide to Python programming', 49.99, 24.99, 5),
-            ('Mystery Novel Bestseller', 'Books & Media', 'BOOK-MYSTERY-01', '567890123457', 'Thrilling mystery novel by acclaimed author', 14.99, 7.99, 5),
-            ('Cookbook Italian Cuisine', 'Books & Media', 'BOOK-COOK-ITALIAN', '567890123458', 'Authentic Italian recipes cookbook', 34.99, 19.99, 5),
-            ('History of Technology', 'Books & Media', 'BOOK-HIST-TECH', '567890123459', 'Comprehensive history of technological advancement', 39.99, 24.99, 5),
-            ('Art Photography Book', 'Books & Media', 'BOOK-ART-PHOTO', '567890123460', 'Beautiful collection of contemporary photography', 59.99, 34.99, 5)
-        ]
-        
-        cursor.executemany('''
-            INSERT INTO products (name, category, sku, barcode, description, unit_price, cost_price, supplier_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', products_data)
+        products_data = seed_data.PRODUCTS
+        cursor.executemany(INSERT_PRODUCTS_SQL, products_data)
         
         print("✅ Sample data inserted successfully")
         
         # Generate sample inventory data
         print("Generating inventory data...")
         
-        # Get all products and warehouses
-        cursor.execute('SELECT id FROM products')
-        product_ids = [row[0] for row in cursor.fetchall()]
-        
-        cursor.execute('SELECT id FROM warehouses')
-        warehouse_ids = [row[0] for row in cursor.fetchall()]
-        
-        # Generate inventory records (not every product in every warehouse)
-        inventory_data = []
-        movement_data = []
-        
-        for product_id in product_ids:
-            # Each product will be in 2-3 random warehouses
-            selected_warehouses = random.sample(warehouse_ids, random.randint(2, min(3, len(warehouse_ids))))
-            
-            for warehouse_id in selected_warehouses:
-                quantity = random.randint(20, 500)
-                reserved = random.randint(0, min(10, quantity // 4))
-                reorder_level = random.randint(10, 50)
-                max_level = random.randint(reorder_level * 10, 2000)
-                
-                inventory_data.append((
-                    product_id, warehouse_id, quantity, reserved,
-                    reorder_level, max_level
-                ))
-                
-                # Create initial stock movement
-                movement_data.append((
-                    product_id, warehouse_id, 'INITIAL', quantity,
-                    f'INIT-{datetime.now().strftime("%Y%m%d")}-{len(movement_data)+1:04d}',
-                    'Initial inventory setup', 1  # admin user
-                ))
-        
-        cursor.executemany('''
-            INSERT INTO inventory (product_id, warehouse_id, quantity, reserved_quantity,
-                                 reorder_level, max_stock_level)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', inventory_data)
-        
-        cursor.executemany('''
-            INSERT INTO stock_movements (product_id, warehouse_id, movement_type,
-                                       quantity, reference_number, notes, user_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', movement_data)
+        # Tables are freshly created, so AUTOINCREMENT ids run 1..N in insert order
+        product_ids = list(range(1, len(products_data) + 1))
+        warehouse_ids = list(range(1, len(warehouses_data) + 1))
+        
+        # Generate inventory records (not every product in every warehouse).
+        # All columns are drawn in one vectorized call each from a seeded
+        # PCG64 generator, so runs are reproducible (override with SEED_RNG).
+        rng = np.random.default_rng(int(os.environ.get('SEED_RNG', '42')))
+        
+        # Each product will be in 2-3 random warehouses: shuffle every
+        # product's warehouse list and keep the first 2-3 entries
+        per_product = rng.integers(2, min(3, len(warehouse_ids)) + 1, size=len(product_ids))
+        shuffled = rng.permuted(np.tile(warehouse_ids, (len(product_ids), 1)), axis=1)
+        product_col = np.repeat(product_ids, per_product)
+        warehouse_col = shuffled[np.arange(len(warehouse_ids)) < per_product[:, None]]
+        
+        quantities = rng.integers(20, 501, size=len(product_col))
+        reserved = rng.integers(0, np.minimum(10, quantities // 4) + 1)
+        reorder_levels = rng.integers(10, 51, size=len(product_col))
+        max_levels = rng.integers(reorder_levels * 10, 2001)
+        
+        # Fill a structured array column by column; tolist() then yields the
+        # executemany row tuples in one C-level conversion
+        inventory_rows = np.empty(len(product_col), dtype=INVENTORY_DTYPE)
+        inventory_rows['product_id'] = product_col
+        inventory_rows['warehouse_id'] = warehouse_col
+        inventory_rows['quantity'] = quantities
+        inventory_rows['reserved_quantity'] = reserved
+        inventory_rows['reorder_level'] = reorder_levels
+        inventory_rows['max_stock_level'] = max_levels
+        inventory_data = inventory_rows.tolist()
+        
+        # Create initial stock movements
+        date_str = datetime.now().strftime("%Y%m%d")
+        reference_number = REFERENCE_NUMBER.format
+        movement_data = [
+            (product_id, warehouse_id, 'INITIAL', quantity,
+             reference_number('INIT', date_str, i + 1),
+             'Initial inventory setup', 1)  # admin user
+            for i, (product_id, warehouse_id, quantity, *_) in enumerate(inventory_data)
+        ]
+        
+        cursor.executemany(INSERT_INVENTORY_SQL, inventory_data)
+        
+        cursor.executemany(INSERT_MOVEMENTS_SQL, movement_data)
         
         print("✅ Inventory data generated successfully")
         
         # Generate some additional stock movements for history
         print("Generating stock movement history...")
         
-        additional_movements = []
         movement_types = ['IN', 'OUT', 'ADJUSTMENT_IN', 'ADJUSTMENT_OUT']
+        history_size = 50  # Generate 50 additional movements
+        
+        # Pick inventory rows by index and gather their ids straight from
+        # the numpy columns instead of indexing the tuple list row by row
+        picks = rng.integers(0, len(inventory_data), size=history_size)
+        pick_products = product_col[picks]
+        pick_warehouses = warehouse_col[picks]
+        types = rng.choice(movement_types, size=history_size)
+        quantities = rng.integers(1, 51, size=history_size)
+        user_ids = rng.integers(1, 6, size=history_size)  # Random user
+        
+        # Generate dates within last 30 days, formatted once each
+        base_now = datetime.now()
+        stamps = [(base_now - timedelta(days=days_ago)).strftime('%Y-%m-%d %H:%M:%S')
+                  for days_ago in rng.integers(0, 31, size=history_size).tolist()]
+        
+        additional_movements = [
+            (product_id, warehouse_id, movement_type, quantity,
+             reference_number(movement_type, stamp[:10].replace('-', ''), i + 1),
+             f'Sample {movement_type.lower()} movement', user_id, stamp)
+            for i, (product_id, warehouse_id, movement_type, quantity, user_id, stamp)
+            in enumerate(zip(pick_products.tolist(), pick_warehouses.tolist(), types.tolist(),
+                             quantities.tolist(), user_ids.tolist(), stamps))
+        ]
         
-        for _ in range(50):  # Generate 50 additional movements
-            inventory_record = random.choice(inventory_data)
-            product_id, warehouse_id = inventory_record[0], inventory_record[1]
-            
-            movement_type = random.choice(movement_types)
-            quantity = random.randint(1, 50)
-            user_id = random.choice([1, 2, 3, 4, 5])  # Random user
-            
-            # Generate date within last 30 days
-            days_ago = random.randint(0, 30)
-            movement_date = datetime.now() - timedelta(days=days_ago)
-            
-            additional_movements.append((
-                product_id, warehouse_id, movement_type, quantity,
-                f'{movement_type}-{movement_date.strftime("%Y%m%d")}-{len(additional_movements)+1:04d}',
-                f'Sample {movement_type.lower()} movement', user_id,
-                movement_date.strftime('%Y-%m-%d %H:%M:%S')
-            ))
-        
-        cursor.executemany('''
-            INSERT INTO stock_movements (product_id, warehouse_id, movement_type,
-                                       quantity, reference_number, notes, user_id, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', additional_movements)
+        cursor.executemany(INSERT_DATED_MOVEMENTS_SQL, additional_movements)
         
         print("✅ Stock movement history generated successfully")
         
         # Generate some alerts
         print("Generating sample alerts...")
         
-        alerts_data = [
-            ('LOW_STOCK', 1, 1, 'Laptop Pro 15" is running low in Main Warehouse (15 units remaining)', 'medium'),
-            ('OUT_OF_STOCK', 5, 2, 'Smart Watch Series 5 is out of stock in West Coast Hub', 'high'),
-            ('REORDER_POINT', 10, 3, 'Dumbbell Set 20kg has reached reorder point in Central Distribution', 'medium'),
-            ('HIGH_DEMAND', 3, 1, 'Wireless Headphones showing unusual high demand pattern', 'low'),
-            ('SYSTEM', None, None, 'Daily inventory sync completed successfully', 'low')
-        ]
-        
-        cursor.executemany('''
-            INSERT INTO alerts (alert_type, product_id, warehouse_id, message, severity)
-            VALUES (?, ?, ?, ?, ?)
-        ''', alerts_data)
+        alerts_data = seed_data.ALERTS
+        multi_insert(cursor, INSERT_ALERTS_SQL, alerts_data)
         
         print("✅ Sample alerts generated successfully")
         
         # Create indexes for better performance
         print("Creating database indexes...")
         
-        cursor.execute('CREATE INDEX idx_inventory_product_warehouse ON inventory(product_id, warehouse_id)')
-        cursor.execute('CREATE INDEX idx_stock_movements_product ON stock_movements(product_id)')
-        cursor.execute('CREATE INDEX idx_stock_movements_warehouse ON stock_movements(warehouse_id)')
-        cursor.execute('CREATE INDEX idx_stock_movements_date ON stock_movements(created_at)')
-        cursor.execute('CREATE INDEX idx_products_sku ON products(sku)')
-        cursor.execute('CREATE INDEX idx_products_category ON products(category)')
-        cursor.execute('CREATE INDEX idx_alerts_unread ON alerts(is_read)')
-        cursor.execute('CREATE INDEX idx_users_username ON users(username)')
-        cursor.execute('CREATE INDEX idx_sessions_token ON user_sessions(session_token)')
+        # Not executescript(): it would COMMIT the open seeding transaction first
+        for statement in INDEX_DDL:
+            cursor.execute(statement)
         
         print("✅ Database indexes created successfully")
         
-        # Commit all changes
-        conn.commit()
+        cursor.execute('PRAGMA foreign_key_check')
+        violations = cursor.fetchall()
+        if violations:
+            raise sqlite3.IntegrityError(f"Seed data violates foreign keys: {violations[:5]}")
+        
+        # Commit all changes, then reclaim the pages freed by dropped tables
+        cursor.execute('COMMIT')
+        cursor.execute('PRAGMA foreign_keys=ON')
+        if reseeding:
+            cursor.execute('VACUUM')
         print(f"\n🎉 Database setup completed successfully!")
         print(f"📍 Database location: {os.path.abspath(database_path)}")
         print("\n📊 Database Statistics:")
         
         # Display statistics
-        cursor.execute('SELECT COUNT(*) FROM users')
-        user_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM products')
-        product_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM warehouses')
-        warehouse_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM inventory')
-        inventory_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM stock_movements')
-        movement_count = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM alerts')
-        alert_count = cursor.fetchone()[0]
+        cursor.execute('''
+            SELECT (SELECT COUNT(*) FROM users),
+                   (SELECT COUNT(*) FROM products),
+                   (SELECT COUNT(*) FROM warehouses),
+                   (SELECT COUNT(*) FROM inventory),
+                   (SELECT COUNT(*) FROM stock_movements),
+                   (SELECT COUNT(*) FROM alerts)
+        ''')
+        (user_count, product_count, warehouse_count,
+         inventory_count, movement_count, alert_count) = cursor.fetchone()
         
         print(f"   👥 Users: {user_count}")
         print(f"   📦 Products: {product_count}")
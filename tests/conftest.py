@@ -0,0 +1,21 @@
+"""
+Shared fixtures for the Retail Inventory Tracker tests.
+
+Modules are imported the way app.py imports them, from the repository root.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def seeded_db(tmp_path, monkeypatch):
+    """Build the sample database with setup_database.py under a temp directory."""
+    import setup_database
+    
+    monkeypatch.chdir(tmp_path)
+    setup_database.create_database()
+    return str(tmp_path / 'database' / 'inventory.db')
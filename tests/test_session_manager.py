@@ -0,0 +1,34 @@
+"""
+Session tokens must never be written to the database in the clear.
+"""
+
+import sqlite3
+
+from flask import Flask
+
+from auth.session_manager import SessionManager
+
+def test_raw_session_token_is_not_stored(seeded_db):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    manager = SessionManager()
+    try:
+        manager.create_session_tables()
+        with app.test_request_context():
+            token = manager.create_session(1, ip_address='127.0.0.1', user_agent='pytest')
+            assert manager.validate_session(1, token)
+        manager.log_user_activity(1, 'login', resource='/dashboard', session_token=token)
+        manager.flush_logs()
+    finally:
+        manager.stop()
+    
+    conn = sqlite3.connect(seeded_db)
+    try:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        assert conn.execute('SELECT COUNT(*) FROM user_activity').fetchone()[0] == 1
+        for table in tables:
+            for row in conn.execute(f'SELECT * FROM "{table}"'):
+                for value in row:
+                    assert token not in str(value), f'raw session token found in {table}'
+    finally:
+        conn.close()
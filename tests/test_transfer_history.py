@@ -0,0 +1,37 @@
+"""
+Paging through get_transfer_history must return every transfer exactly once.
+"""
+
+import sqlite3
+
+from warehouse.warehouse_controller import WarehouseController
+
+MOVEMENT_SQL = '''
+    INSERT INTO stock_movements (product_id, warehouse_id, movement_type, quantity,
+                                 reference_number, notes, user_id, created_at)
+    VALUES (1, ?, ?, ?, 'TRANSFER-SAME-SECOND', NULL, 1, datetime('now'))
+'''
+
+def test_pages_cover_transfers_sharing_a_reference(seeded_db):
+    # Transfers made within one second share a reference, so the history
+    # self-join pairs each TRANSFER_OUT with every TRANSFER_IN
+    conn = sqlite3.connect(seeded_db)
+    with conn:
+        for quantity in range(3):
+            conn.execute(MOVEMENT_SQL, (1, 'TRANSFER_OUT', quantity))
+            conn.execute(MOVEMENT_SQL, (2, 'TRANSFER_IN', quantity))
+    conn.close()
+    
+    controller = WarehouseController(seeded_db)
+    everything = controller.get_transfer_history(limit=1000)['items']
+    
+    paged, cursor = [], None
+    while True:
+        page = controller.get_transfer_history(limit=2, before=cursor)
+        paged.extend(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    
+    assert len(everything) >= 9
+    assert [t.to_dict() for t in paged] == [t.to_dict() for t in everything]
@@ -0,0 +1,127 @@
+"""
+warehouse_stats must always match a live aggregate over inventory.
+"""
+
+import importlib
+import sqlite3
+import sys
+import types
+
+from warehouse.warehouse_controller import WarehouseController
+
+LIVE_STATS_SQL = '''
+    SELECT warehouse_id, COUNT(*), SUM(quantity),
+           COUNT(CASE WHEN quantity <= reorder_level THEN 1 END)
+    FROM inventory
+    GROUP BY warehouse_id
+    ORDER BY warehouse_id
+'''
+STORED_STATS_SQL = '''
+    SELECT warehouse_id, total_products, total_items, low_stock_products
+    FROM warehouse_stats
+    WHERE total_products > 0
+    ORDER BY warehouse_id
+'''
+
+def assert_stats_match(database_path):
+    conn = sqlite3.connect(database_path)
+    try:
+        assert conn.execute(STORED_STATS_SQL).fetchall() == conn.execute(LIVE_STATS_SQL).fetchall()
+    finally:
+        conn.close()
+
+def test_update_or_replace_keeps_stats(seeded_db):
+    WarehouseController(seeded_db).get_all_warehouses()  # installs the triggers
+    
+    conn = sqlite3.connect(seeded_db)
+    product_id, warehouse_id = conn.execute(
+        'SELECT product_id, warehouse_id FROM inventory LIMIT 1').fetchone()
+    with conn:
+        # The statement's OR REPLACE also applies to the statements its triggers run
+        conn.execute('''
+            UPDATE OR REPLACE inventory SET quantity = quantity + 5
+            WHERE product_id = ? AND warehouse_id = ?
+        ''', (product_id, warehouse_id))
+    conn.close()
+    
+    assert_stats_match(seeded_db)
+
+def test_add_stock_movement_keeps_stats(tmp_path, monkeypatch):
+    # The reports package isn't part of this tree; app.py only needs the name
+    exporter = types.ModuleType('reports.exporter')
+    exporter.ReportExporter = type('ReportExporter', (), {})
+    monkeypatch.setitem(sys.modules, 'reports', types.ModuleType('reports'))
+    monkeypatch.setitem(sys.modules, 'reports.exporter', exporter)
+    monkeypatch.chdir(tmp_path)
+    app_module = importlib.import_module('app')
+    app_module.init_database()
+    app_module.session_manager.stop()
+    
+    database_path = app_module.DATABASE_PATH
+    conn = sqlite3.connect(database_path)
+    with conn:
+        conn.execute("INSERT INTO warehouses (name, location, capacity) VALUES ('North', 'Here', 1000)")
+        conn.execute("INSERT INTO warehouses (name, location, capacity) VALUES ('South', 'There', 1000)")
+        conn.execute("INSERT INTO products (name, sku, category, unit_price) VALUES ('Widget', 'W-1', 'Parts', 1.5)")
+    conn.close()
+    WarehouseController(database_path).get_all_warehouses()  # installs the triggers
+    
+    client = app_module.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = 1
+    for movement_type, warehouse_id, quantity in [
+        ('in', 1, 40), ('in', 1, 15), ('out', 1, 50), ('in', 2, 5), ('adjustment', 2, 20),
+    ]:
+        client.post('/add_stock_movement', data={
+            'movement_type': movement_type, 'product_id': 1,
+            'warehouse_id': warehouse_id, 'quantity': quantity,
+        })
+    
+    conn = sqlite3.connect(database_path)
+    try:
+        quantities = conn.execute(
+            'SELECT warehouse_id, quantity FROM inventory ORDER BY warehouse_id').fetchall()
+        assert quantities == [(1, 5), (2, 25)]
+    finally:
+        conn.close()
+    assert_stats_match(database_path)
+
+def test_duplicate_inventory_rows_do_not_block_stats(tmp_path):
+    # The inventory table app.py created before it had a unique key
+    database_path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(database_path)
+    conn.executescript('''
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT);
+        CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT, category TEXT);
+        CREATE TABLE warehouses (id INTEGER PRIMARY KEY, name TEXT, location TEXT,
+                                 capacity INTEGER, manager_id INTEGER, created_at TIMESTAMP);
+        CREATE TABLE stock_movements (id INTEGER PRIMARY KEY, product_id INTEGER,
+                                      warehouse_id INTEGER, movement_type TEXT, quantity INTEGER,
+                                      reference_number TEXT, notes TEXT, user_id INTEGER,
+                                      created_at TIMESTAMP);
+        CREATE TABLE inventory (id INTEGER PRIMARY KEY AUTOINCREMENT, product_id INTEGER,
+                                warehouse_id INTEGER, quantity INTEGER,
+                                reorder_level INTEGER DEFAULT 10, max_stock_level INTEGER,
+                                last_updated TIMESTAMP);
+        INSERT INTO warehouses (id, name, location, capacity) VALUES (1, 'Main', 'Here', 100);
+        INSERT INTO products (id, name, category) VALUES (1, 'Widget', 'Parts');
+        INSERT INTO inventory (product_id, warehouse_id, quantity) VALUES (1, 1, 5), (1, 1, 8);
+    ''')
+    conn.close()
+    
+    warehouses = WarehouseController(database_path).get_all_warehouses()
+    
+    # The rows are left for migrate_database.py to merge
+    assert [(w.total_products, w.total_items) for w in warehouses] == [(2, 13)]
+    assert_stats_match(database_path)
+
+def test_seeded_inventory_has_one_unique_key(seeded_db):
+    WarehouseController(seeded_db).get_all_warehouses()
+    
+    conn = sqlite3.connect(seeded_db)
+    try:
+        unique_indexes = conn.execute(
+            "SELECT name FROM pragma_index_list('inventory') WHERE \"unique\" = 1").fetchall()
+    finally:
+        conn.close()
+    assert len(unique_indexes) == 1
@@ -6,18 +6,385 @@ inventory transfers, capacity management, and warehouse analytics.
 """
 
 import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 import logging
+from db_config import apply_pragmas
 
 logger = logging.getLogger(__name__)
 
+# Bind datetimes in the same 'YYYY-MM-DD HH:MM:SS' form CURRENT_TIMESTAMP uses,
+# instead of going through sqlite3's deprecated default adapter on every write
+sqlite3.register_adapter(datetime, lambda dt: dt.isoformat(' ', 'seconds'))
+
+# Per-warehouse inventory totals kept current by triggers on inventory, so the
+# dashboard reads don't have to aggregate the whole inventory table. The triggers
+# are recreated on startup so databases pick up changes to their bodies, and they
+# seed a stats row with NOT EXISTS rather than OR IGNORE: a conflict clause would be
+# overridden by the calling statement's, e.g. INSERT OR REPLACE INTO inventory.
+WAREHOUSE_STATS_DDL = (
+    '''
+    CREATE TABLE IF NOT EXISTS warehouse_stats (
+        warehouse_id INTEGER PRIMARY KEY,
+        total_products INTEGER NOT NULL DEFAULT 0,
+        total_items INTEGER NOT NULL DEFAULT 0,
+        low_stock_products INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    'DROP TRIGGER IF EXISTS trg_inventory_stats_insert',
+    '''
+    CREATE TRIGGER trg_inventory_stats_insert AFTER INSERT ON inventory
+    BEGIN
+        INSERT INTO warehouse_stats (warehouse_id)
+        SELECT NEW.warehouse_id
+        WHERE NOT EXISTS (SELECT 1 FROM warehouse_stats WHERE warehouse_id = NEW.warehouse_id);
+        UPDATE warehouse_stats
+        SET total_products = total_products + 1,
+            total_items = total_items + NEW.quantity,
+            low_stock_products = low_stock_products + (NEW.quantity <= NEW.reorder_level)
+        WHERE warehouse_id = NEW.warehouse_id;
+    END
+    ''',
+    'DROP TRIGGER IF EXISTS trg_inventory_stats_delete',
+    '''
+    CREATE TRIGGER trg_inventory_stats_delete AFTER DELETE ON inventory
+    BEGIN
+        UPDATE warehouse_stats
+        SET total_products = total_products - 1,
+            total_items = total_items - OLD.quantity,
+            low_stock_products = low_stock_products - (OLD.quantity <= OLD.reorder_level)
+        WHERE warehouse_id = OLD.warehouse_id;
+    END
+    ''',
+    'DROP TRIGGER IF EXISTS trg_inventory_stats_update',
+    '''
+    CREATE TRIGGER trg_inventory_stats_update
+    AFTER UPDATE OF warehouse_id, quantity, reorder_level ON inventory
+    BEGIN
+        UPDATE warehouse_stats
+        SET total_products = total_products - 1,
+            total_items = total_items - OLD.quantity,
+            low_stock_products = low_stock_products - (OLD.quantity <= OLD.reorder_level)
+        WHERE warehouse_id = OLD.warehouse_id;
+        INSERT INTO warehouse_stats (warehouse_id)
+        SELECT NEW.warehouse_id
+        WHERE NOT EXISTS (SELECT 1 FROM warehouse_stats WHERE warehouse_id = NEW.warehouse_id);
+        UPDATE warehouse_stats
+        SET total_products = total_products + 1,
+            total_items = total_items + NEW.quantity,
+            low_stock_products = low_stock_products + (NEW.quantity <= NEW.reorder_level)
+        WHERE warehouse_id = NEW.warehouse_id;
+    END
+    ''',
+)
+
+# Indexes behind the controller's lookups and joins. Names match setup_database.py
+# where it already builds the same index, so seeded databases don't get duplicates.
+WAREHOUSE_INDEX_DDL = (
+    'CREATE INDEX IF NOT EXISTS idx_inv_wh_prod ON inventory(warehouse_id, product_id)',
+    'CREATE INDEX IF NOT EXISTS idx_sm_ref ON stock_movements(reference_number)',
+    'CREATE INDEX IF NOT EXISTS idx_sm_wh_created ON stock_movements(warehouse_id, created_at DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_stock_movements_product ON stock_movements(product_id)',
+)
+# Any unique index whose key is exactly (product_id, warehouse_id), including the
+# autoindex behind a table-level UNIQUE constraint
+INVENTORY_UNIQUE_KEY_SQL = '''
+    SELECT 1 FROM pragma_index_list('inventory') AS il
+    WHERE il."unique" = 1
+      AND (SELECT group_concat(name) FROM (
+               SELECT name FROM pragma_index_info(il.name) ORDER BY seqno
+           )) = 'product_id,warehouse_id'
+'''
+# Only built for inventory tables created by app.py before it declared the key
+UNIQUE_INVENTORY_INDEX_DDL = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_product_warehouse
+    ON inventory(product_id, warehouse_id)
+'''
+REBUILD_WAREHOUSE_STATS_SQL = '''
+    INSERT INTO warehouse_stats (warehouse_id, total_products, total_items, low_stock_products)
+    SELECT warehouse_id, COUNT(*), COALESCE(SUM(quantity), 0),
+           COUNT(CASE WHEN quantity <= reorder_level THEN 1 END)
+    FROM inventory
+    GROUP BY warehouse_id
+'''
+
+# Statements are module constants so every call hands sqlite3 the same text and
+# the connection's statement cache can reuse the prepared statement
+WAREHOUSE_INFO_SQL = '''
+    SELECT w.id, w.name, w.location, w.capacity, w.manager_id, w.created_at,
+           u.username AS manager_name,
+           COALESCE(s.total_products, 0) AS total_products,
+           COALESCE(s.total_items, 0) AS total_items,
+           COALESCE(s.low_stock_products, 0) AS low_stock_products,
+           CAST(s.total_items AS REAL) / NULLIF(s.total_products, 0) AS avg_stock_level
+    FROM warehouses w
+    LEFT JOIN users u ON w.manager_id = u.id
+    LEFT JOIN warehouse_stats s ON w.id = s.warehouse_id
+    WHERE w.id = ?
+'''
+TOP_PRODUCTS_SQL = '''
+    SELECT p.name, i.quantity, p.category
+    FROM inventory i
+    JOIN products p ON i.product_id = p.id
+    WHERE i.warehouse_id = ?
+    ORDER BY i.quantity DESC
+    LIMIT 5
+'''
+RECENT_MOVEMENTS_SQL = '''
+    SELECT sm.movement_type, sm.quantity, p.name, sm.created_at, u.username
+    FROM stock_movements sm
+    JOIN products p ON sm.product_id = p.id
+    JOIN users u ON sm.user_id = u.id
+    WHERE sm.warehouse_id = ?
+    ORDER BY sm.created_at DESC
+    LIMIT 10
+'''
+INVENTORY_QUANTITY_SQL = '''
+    SELECT quantity FROM inventory
+    WHERE product_id = ? AND warehouse_id = ?
+'''
+# Removes stock only if the row holds enough, so the stock check and the write
+# happen in one statement with no race between them
+WITHDRAW_INVENTORY_SQL = '''
+    UPDATE inventory
+    SET quantity = quantity - ?, last_updated = ?
+    WHERE product_id = ? AND warehouse_id = ? AND quantity >= ?
+    RETURNING quantity
+'''
+# Applies a quantity delta unless it would take the row below zero. Databases not
+# yet migrated lack CHECK (quantity >= 0), so the guard has to stay in the WHERE.
+ADD_INVENTORY_QUANTITY_SQL = '''
+    UPDATE inventory
+    SET quantity = quantity + ?, last_updated = ?
+    WHERE product_id = ? AND warehouse_id = ? AND quantity + ? >= 0
+    RETURNING quantity
+'''
+# Creates the destination row, copying stock levels from the source warehouse's row
+INSERT_TRANSFERRED_INVENTORY_SQL = '''
+    INSERT INTO inventory (product_id, warehouse_id, quantity, reorder_level, max_stock_level)
+    SELECT ?, ?, ?, COALESCE(reorder_level, 10), COALESCE(max_stock_level, 1000)
+    FROM inventory
+    WHERE product_id = ? AND warehouse_id = ?
+'''
+INSERT_MOVEMENT_SQL = '''
+    INSERT INTO stock_movements (product_id, warehouse_id, movement_type, quantity,
+                                 reference_number, notes, user_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+# One row per warehouse with everything the summary list and capacity report show
+WAREHOUSE_AGGREGATE_SQL = '''
+    SELECT w.id, w.name, w.location, w.capacity,
+           COALESCE(s.total_products, 0) as total_products,
+           COALESCE(s.total_items, 0) as total_items,
+           COALESCE(s.low_stock_products, 0) as low_stock_products,
+           CASE WHEN w.capacity > 0
+                THEN CAST(COALESCE(s.total_items, 0) AS REAL) / w.capacity * 100
+                ELSE 0 END as utilization,
+           CASE WHEN w.capacity > 0
+                THEN MAX(w.capacity - COALESCE(s.total_items, 0), 0)
+                ELSE 0 END as available_capacity,
+           u.username as manager_name
+    FROM warehouses w
+    LEFT JOIN warehouse_stats s ON w.id = s.warehouse_id
+    LEFT JOIN users u ON w.manager_id = u.id
+    ORDER BY w.name
+'''
+# References are only unique to the second, so one TRANSFER_OUT row can pair with
+# several TRANSFER_IN rows; sm2.id is part of the page key for that reason
+TRANSFER_HISTORY_SQL = '''
+    SELECT sm1.id, sm2.id AS in_id, sm1.product_id, p.name as product_name, sm1.warehouse_id as from_warehouse,
+           sm2.warehouse_id as to_warehouse, sm1.quantity, sm1.reference_number,
+           sm1.created_at, u.username, sm1.notes,
+           w1.name as from_warehouse_name, w2.name as to_warehouse_name
+    FROM stock_movements sm1
+    JOIN stock_movements sm2 ON sm1.reference_number = sm2.reference_number
+    JOIN products p ON sm1.product_id = p.id
+    JOIN users u ON sm1.user_id = u.id
+    JOIN warehouses w1 ON sm1.warehouse_id = w1.id
+    JOIN warehouses w2 ON sm2.warehouse_id = w2.id
+    WHERE sm1.movement_type = 'TRANSFER_OUT'
+      AND sm2.movement_type = 'TRANSFER_IN'
+      AND sm1.created_at >= ?
+'''
+UNEVEN_DISTRIBUTION_SQL = '''
+    WITH stock AS (
+        SELECT i.product_id, i.quantity, w.name AS warehouse_name,
+               AVG(i.quantity) OVER product AS avg_quantity,
+               MAX(i.quantity) OVER product - MIN(i.quantity) OVER product AS quantity_difference,
+               COUNT(*) OVER product AS warehouse_count,
+               ROW_NUMBER() OVER (PARTITION BY i.product_id
+                                  ORDER BY i.quantity DESC, i.warehouse_id DESC) AS high_rank,
+               ROW_NUMBER() OVER (PARTITION BY i.product_id
+                                  ORDER BY i.quantity, i.warehouse_id) AS low_rank
+        FROM inventory i
+        JOIN warehouses w ON i.warehouse_id = w.id
+        WINDOW product AS (PARTITION BY i.product_id)
+    )
+    SELECT hi.product_id, p.name, hi.warehouse_name, hi.quantity,
+           lo.warehouse_name, lo.quantity, hi.avg_quantity, hi.quantity_difference
+    FROM stock hi
+    JOIN stock lo ON lo.product_id = hi.product_id AND lo.low_rank = 1
+    JOIN products p ON hi.product_id = p.id
+    WHERE hi.high_rank = 1
+      AND hi.warehouse_count > 1
+      AND hi.quantity_difference > hi.avg_quantity * 0.5
+    ORDER BY hi.quantity_difference DESC
+'''
+
+def _ttl_cache(seconds=10):
+    """Memoize a no-argument controller method for `seconds` per instance."""
+    def decorator(method):
+        key = method.__name__
+        
+        @wraps(method)
+        def wrapper(self):
+            cached = self._cache.get(key)
+            now = time.monotonic()
+            if cached and now - cached[0] < seconds:
+                return cached[1]
+            result = method(self)
+            # Failures come back as empty lists; don't pin those for the whole window
+            if result:
+                self._cache[key] = (now, result)
+            return result
+        return wrapper
+    return decorator
+
+class _Record:
+    """Base for the slotted result records returned by the controller."""
+    __slots__ = ()
+    _rounded = ()  # Float fields rounded to 2 places when serialized
+    
+    def to_dict(self) -> Dict:
+        """Return the record as the JSON-ready dict the views expect."""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        for name in self._rounded:
+            data[name] = round(data[name], 2)
+        return data
+
+@dataclass
+class WarehouseSummary(_Record):
+    """One warehouse in the get_all_warehouses listing."""
+    __slots__ = ('id', 'name', 'location', 'capacity', 'capacity_utilization',
+                 'total_products', 'total_items', 'manager_name')
+    _rounded = ('capacity_utilization',)
+    id: int
+    name: str
+    location: str
+    capacity: Optional[int]
+    capacity_utilization: float
+    total_products: int
+    total_items: int
+    manager_name: Optional[str]
+
+@dataclass
+class CapacityRow(_Record):
+    """One warehouse in the capacity utilization report."""
+    __slots__ = ('warehouse_id', 'warehouse_name', 'location', 'capacity', 'total_items',
+                 'unique_products', 'low_stock_items', 'utilization_percentage',
+                 'available_capacity', 'capacity_status')
+    _rounded = ('utilization_percentage',)
+    warehouse_id: int
+    warehouse_name: str
+    location: str
+    capacity: Optional[int]
+    total_items: int
+    unique_products: int
+    low_stock_items: int
+    utilization_percentage: float
+    available_capacity: int
+    capacity_status: str
+
+@dataclass
+class TransferRecord(_Record):
+    """One warehouse-to-warehouse transfer in the transfer history."""
+    __slots__ = ('product_id', 'product_name', 'from_warehouse_id', 'to_warehouse_id',
+                 'from_warehouse_name', 'to_warehouse_name', 'quantity', 'reference_number',
+                 'transfer_date', 'transferred_by', 'notes')
+    product_id: int
+    product_name: str
+    from_warehouse_id: int
+    to_warehouse_id: int
+    from_warehouse_name: str
+    to_warehouse_name: str
+    quantity: int
+    reference_number: str
+    transfer_date: str
+    transferred_by: str
+    notes: Optional[str]
+
+def _capacity_status(utilization):
+    """Classify a utilization percentage as CRITICAL, WARNING or NORMAL."""
+    if utilization >= 90:
+        return 'CRITICAL'
+    if utilization >= 75:
+        return 'WARNING'
+    return 'NORMAL'
+
 class WarehouseController:
     """Manages warehouse operations and inventory transfers."""
     
     def __init__(self, database_path='database/inventory.db'):
         """Initialize the warehouse controller."""
         self.database_path = database_path
+        self._local = threading.local()  # One pooled connection per thread
+        self._cache = {}  # method name -> (monotonic timestamp, result)
+        self._schema_ready = False  # Indexes and warehouse_stats in place
+        self._schema_lock = threading.Lock()
+    
+    def _conn(self):
+        """Return this thread's connection, opening and tuning it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path, check_same_thread=False,
+                                   cached_statements=256)
+            apply_pragmas(conn)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        if not self._schema_ready:
+            self._ensure_schema(conn)
+        return conn
+    
+    def _ensure_schema(self, conn):
+        """Create missing indexes and warehouse_stats, then rebuild the stats rows."""
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            # Separate step: a failure here must not keep warehouse_stats from being built.
+            # Duplicate rows are left alone; migrate_database.py merges them.
+            try:
+                if not conn.execute(INVENTORY_UNIQUE_KEY_SQL).fetchone():
+                    with conn:
+                        conn.execute(UNIQUE_INVENTORY_INDEX_DDL)
+            except Exception as e:
+                logger.error(f"Error creating unique inventory index "
+                             f"(run migrate_database.py to merge duplicate rows): {e}")
+            try:
+                # Rebuilt once per process so totals survive edits made without the triggers
+                with conn:
+                    conn.execute('BEGIN IMMEDIATE')
+                    for statement in WAREHOUSE_INDEX_DDL + WAREHOUSE_STATS_DDL:
+                        conn.execute(statement)
+                    conn.execute('DELETE FROM warehouse_stats')
+                    conn.execute(REBUILD_WAREHOUSE_STATS_SQL)
+                self._schema_ready = True
+            except Exception as e:
+                # Raised so callers report the cause instead of reading a missing table
+                logger.error(f"Error preparing warehouse schema: {e}")
+                raise
+    
+    def ensure_schema(self):
+        """Prepare the controller's indexes and warehouse_stats; raises if that fails."""
+        self._conn()
+    
+    def _invalidate_cache(self):
+        """Drop memoized reports after inventory has changed."""
+        for key in ('_warehouse_aggregate_rows', 'optimize_inventory_distribution'):
+            self._cache.pop(key, None)
     
     def get_warehouse_info(self, warehouse_id: int) -> Optional[Dict]:
         """
@@ -30,71 +397,21 @@ class WarehouseController:
             dict: Warehouse information with inventory statistics
         """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            # Get warehouse basic info
-            cursor.execute('''
-                SELECT id, name, location, capacity, manager_id, created_at
-                FROM warehouses
-                WHERE id = ?
-            ''', (warehouse_id,))
+            conn = self._conn()
             
-            warehouse_data = cursor.fetchone()
+            # Warehouse row, manager name and summary statistics in one pass
+            warehouse_data = conn.execute(WAREHOUSE_INFO_SQL, (warehouse_id,)).fetchone()
             if not warehouse_data:
-                conn.close()
                 return None
             
-            warehouse_id, name, location, capacity, manager_id, created_at = warehouse_data
-            
-            # Get manager info if exists
-            manager_name = None
-            if manager_id:
-                cursor.execute('SELECT username FROM users WHERE id = ?', (manager_id,))
-                manager_result = cursor.fetchone()
-                if manager_result:
-                    manager_name = manager_result[0]
-            
-            # Get inventory statistics
-            cursor.execute('''
-                SELECT 
-                    COUNT(DISTINCT i.product_id) as total_products,
-                    SUM(i.quantity) as total_items,
-                    COUNT(CASE WHEN i.quantity <= i.reorder_level THEN 1 END) as low_stock_products,
-                    AVG(i.quantity) as avg_stock_level
-                FROM inventory i
-                WHERE i.warehouse_id = ?
-            ''', (warehouse_id,))
-            
-            stats = cursor.fetchone()
-            total_products, total_items, low_stock_products, avg_stock_level = stats or (0, 0, 0, 0)
+            (warehouse_id, name, location, capacity, manager_id, created_at, manager_name,
+             total_products, total_items, low_stock_products, avg_stock_level) = warehouse_data
             
             # Get top products by quantity
-            cursor.execute('''
-                SELECT p.name, i.quantity, p.category
-                FROM inventory i
-                JOIN products p ON i.product_id = p.id
-                WHERE i.warehouse_id = ?
-                ORDER BY i.quantity DESC
-                LIMIT 5
-            ''', (warehouse_id,))
-            
-            top_products = cursor.fetchall()
+            top_products = [tuple(row) for row in conn.execute(TOP_PRODUCTS_SQL, (warehouse_id,))]
             
             # Get recent stock movements
-            cursor.execute('''
-                SELECT sm.movement_type, sm.quantity, p.name, sm.created_at, u.username
-                FROM stock_movements sm
-                JOIN products p ON sm.product_id = p.id
-                JOIN users u ON sm.user_id = u.id
-                WHERE sm.warehouse_id = ?
-                ORDER BY sm.created_at DESC
-                LIMIT 10
-            ''', (warehouse_id,))
-            
-            recent_movements = cursor.fetchall()
-            
-            conn.close()
+            recent_movements = [tuple(row) for row in conn.execute(RECENT_MOVEMENTS_SQL, (warehouse_id,))]
             
             # Calculate capacity utilization
             capacity_utilization = 0
@@ -124,50 +441,29 @@ class WarehouseController:
             logger.error(f"Error getting warehouse info: {e}")
             return None
     
-    def get_all_warehouses(self) -> List[Dict]:
+    @_ttl_cache(seconds=10)
+    def _warehouse_aggregate_rows(self):
+        """Return the per-warehouse totals shared by the summary and capacity views."""
+        return self._conn().execute(WAREHOUSE_AGGREGATE_SQL).fetchall()
+    
+    def get_all_warehouses(self) -> List[WarehouseSummary]:
         """
         Get information about all warehouses.
         
         Returns:
-            list: List of warehouse information dictionaries
+            list: WarehouseSummary records; use to_dict() for JSON
         """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT w.id, w.name, w.location, w.capacity,
-                       COUNT(DISTINCT i.product_id) as total_products,
-                       COALESCE(SUM(i.quantity), 0) as total_items,
-                       u.username as manager_name
-                FROM warehouses w
-                LEFT JOIN inventory i ON w.id = i.warehouse_id
-                LEFT JOIN users u ON w.manager_id = u.id
-                GROUP BY w.id, w.name, w.location, w.capacity, u.username
-                ORDER BY w.name
-            ''')
-            
-            warehouses = []
-            for row in cursor.fetchall():
-                warehouse_id, name, location, capacity, total_products, total_items, manager_name = row
-                
-                capacity_utilization = 0
-                if capacity and capacity > 0:
-                    capacity_utilization = (total_items / capacity) * 100
-                
-                warehouses.append({
-                    'id': warehouse_id,
-                    'name': name,
-                    'location': location,
-                    'capacity': capacity,
-                    'capacity_utilization': round(capacity_utilization, 2),
-                    'total_products': total_products or 0,
-                    'total_items': total_items or 0,
-                    'manager_name': manager_name
-                })
-            
-            conn.close()
-            return warehouses
+            return [WarehouseSummary(
+                id=row['id'],
+                name=row['name'],
+                location=row['location'],
+                capacity=row['capacity'],
+                capacity_utilization=row['utilization'],
+                total_products=row['total_products'],
+                total_items=row['total_items'],
+                manager_name=row['manager_name']
+            ) for row in self._warehouse_aggregate_rows()]
             
         except Exception as e:
             logger.error(f"Error getting all warehouses: {e}")
@@ -191,114 +487,59 @@ class WarehouseController:
             dict: Transfer result with success status and message
         """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            # Validate source warehouse has enough inventory
-            cursor.execute('''
-                SELECT quantity FROM inventory
-                WHERE product_id = ? AND warehouse_id = ?
-            ''', (product_id, from_warehouse_id))
-            
-            source_result = cursor.fetchone()
-            if not source_result:
-                conn.close()
-                return {
-                    'success': False,
-                    'message': 'Product not found in source warehouse'
-                }
-            
-            source_quantity = source_result[0]
-            if source_quantity < quantity:
-                conn.close()
-                return {
-                    'success': False,
-                    'message': f'Insufficient inventory. Available: {source_quantity}, Requested: {quantity}'
-                }
-            
-            # Check if destination warehouse has inventory record
-            cursor.execute('''
-                SELECT quantity FROM inventory
-                WHERE product_id = ? AND warehouse_id = ?
-            ''', (product_id, to_warehouse_id))
-            
-            dest_result = cursor.fetchone()
-            
-            try:
-                # Start transaction
-                cursor.execute('BEGIN TRANSACTION')
-                
-                # Update source warehouse (subtract quantity)
-                new_source_quantity = source_quantity - quantity
-                cursor.execute('''
-                    UPDATE inventory
-                    SET quantity = ?, last_updated = ?
-                    WHERE product_id = ? AND warehouse_id = ?
-                ''', (new_source_quantity, datetime.now(), product_id, from_warehouse_id))
+            conn = self._conn()
+            
+            # One timestamp for both inventory rows and the transfer reference
+            now = datetime.now()
+            
+            # The connection context manager commits on success and rolls back on error
+            with conn:
+                # Take the quantity out of the source warehouse if it holds enough
+                withdrawn = conn.execute(WITHDRAW_INVENTORY_SQL,
+                                         (quantity, now, product_id, from_warehouse_id, quantity)).fetchall()
+                if not withdrawn:
+                    source_result = conn.execute(INVENTORY_QUANTITY_SQL,
+                                                 (product_id, from_warehouse_id)).fetchone()
+                    if not source_result:
+                        return {
+                            'success': False,
+                            'message': 'Product not found in source warehouse'
+                        }
+                    return {
+                        'success': False,
+                        'message': f'Insufficient inventory. Available: {source_result[0]}, Requested: {quantity}'
+                    }
                 
-                # Update or create destination warehouse record
-                if dest_result:
-                    # Update existing record
-                    new_dest_quantity = dest_result[0] + quantity
-                    cursor.execute('''
-                        UPDATE inventory
-                        SET quantity = ?, last_updated = ?
-                        WHERE product_id = ? AND warehouse_id = ?
-                    ''', (new_dest_quantity, datetime.now(), product_id, to_warehouse_id))
-                else:
-                    # Create new inventory record for destination
-                    cursor.execute('''
-                        SELECT reorder_level, max_stock_level
-                        FROM inventory
-                        WHERE product_id = ? AND warehouse_id = ?
-                    ''', (product_id, from_warehouse_id))
-                    
-                    reorder_info = cursor.fetchone()
-                    reorder_level = reorder_info[0] if reorder_info else 10
-                    max_stock_level = reorder_info[1] if reorder_info else 1000
-                    
-                    cursor.execute('''
-                        INSERT INTO inventory (product_id, warehouse_id, quantity, reorder_level, max_stock_level)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (product_id, to_warehouse_id, quantity, reorder_level, max_stock_level))
+                # Add to the destination record, creating it if this is the first stock there
+                received = conn.execute(ADD_INVENTORY_QUANTITY_SQL,
+                                        (quantity, now, product_id, to_warehouse_id, quantity)).fetchall()
+                if not received:
+                    conn.execute(INSERT_TRANSFERRED_INVENTORY_SQL,
+                                 (product_id, to_warehouse_id, quantity, product_id, from_warehouse_id))
                 
                 # Record stock movements
-                transfer_reference = f"TRANSFER-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                
-                # Outbound movement from source
-                cursor.execute('''
-                    INSERT INTO stock_movements (product_id, warehouse_id, movement_type, quantity,
-                                               reference_number, notes, user_id)
-                    VALUES (?, ?, 'TRANSFER_OUT', ?, ?, ?, ?)
-                ''', (product_id, from_warehouse_id, quantity, transfer_reference, 
-                     f"Transfer to warehouse {to_warehouse_id}. {notes or ''}", user_id))
-                
-                # Inbound movement to destination
-                cursor.execute('''
-                    INSERT INTO stock_movements (product_id, warehouse_id, movement_type, quantity,
-                                               reference_number, notes, user_id)
-                    VALUES (?, ?, 'TRANSFER_IN', ?, ?, ?, ?)
-                ''', (product_id, to_warehouse_id, quantity, transfer_reference,
-                     f"Transfer from warehouse {from_warehouse_id}. {notes or ''}", user_id))
-                
-                # Commit transaction
-                cursor.execute('COMMIT')
-                conn.close()
-                
-                logger.info(f"Inventory transfer completed: {quantity} units of product {product_id} "
-                           f"from warehouse {from_warehouse_id} to {to_warehouse_id} by user {user_id}")
-                
-                return {
-                    'success': True,
-                    'message': f'Successfully transferred {quantity} units',
-                    'transfer_reference': transfer_reference
-                }
-                
-            except Exception as e:
-                cursor.execute('ROLLBACK')
-                conn.close()
-                raise e
+                transfer_reference = f"TRANSFER-{now.strftime('%Y%m%d%H%M%S')}"
                 
+                # Outbound movement from source, inbound movement to destination
+                movements = [
+                    (product_id, from_warehouse_id, 'TRANSFER_OUT', quantity, transfer_reference,
+                     f"Transfer to warehouse {to_warehouse_id}. {notes or ''}", user_id),
+                    (product_id, to_warehouse_id, 'TRANSFER_IN', quantity, transfer_reference,
+                     f"Transfer from warehouse {from_warehouse_id}. {notes or ''}", user_id),
+                ]
+                conn.executemany(INSERT_MOVEMENT_SQL, movements)
+            
+            self._invalidate_cache()
+            
+            logger.info(f"Inventory transfer completed: {quantity} units of product {product_id} "
+                       f"from warehouse {from_warehouse_id} to {to_warehouse_id} by user {user_id}")
+            
+            return {
+                'success': True,
+                'message': f'Successfully transferred {quantity} units',
+                'transfer_reference': transfer_reference
+            }
+            
         except Exception as e:
             logger.error(f"Error during inventory transfer: {e}")
             return {
@@ -324,74 +565,52 @@ class WarehouseController:
             dict: Adjustment result
         """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            # Get current inventory
-            cursor.execute('''
-                SELECT quantity FROM inventory
-                WHERE product_id = ? AND warehouse_id = ?
-            ''', (product_id, warehouse_id))
-            
-            result = cursor.fetchone()
-            if not result:
-                conn.close()
-                return {
-                    'success': False,
-                    'message': 'Inventory record not found'
-                }
-            
-            current_quantity = result[0]
-            new_quantity = current_quantity + adjustment_quantity
-            
-            # Ensure new quantity is not negative
-            if new_quantity < 0:
-                conn.close()
-                return {
-                    'success': False,
-                    'message': f'Adjustment would result in negative inventory. Current: {current_quantity}, Adjustment: {adjustment_quantity}'
-                }
+            conn = self._conn()
             
-            try:
-                cursor.execute('BEGIN TRANSACTION')
+            now = datetime.now()
+            
+            with conn:
+                result = conn.execute(ADD_INVENTORY_QUANTITY_SQL,
+                                      (adjustment_quantity, now, product_id, warehouse_id,
+                                       adjustment_quantity)).fetchall()
+                
+                # No row updated: either there is no record or the guard refused it
+                if not result:
+                    current = conn.execute(INVENTORY_QUANTITY_SQL, (product_id, warehouse_id)).fetchone()
+                    if not current:
+                        return {
+                            'success': False,
+                            'message': 'Inventory record not found'
+                        }
+                    return {
+                        'success': False,
+                        'message': f'Adjustment would result in negative inventory. Current: {current[0]}, Adjustment: {adjustment_quantity}'
+                    }
                 
-                # Update inventory
-                cursor.execute('''
-                    UPDATE inventory
-                    SET quantity = ?, last_updated = ?
-                    WHERE product_id = ? AND warehouse_id = ?
-                ''', (new_quantity, datetime.now(), product_id, warehouse_id))
+                new_quantity = result[0][0]
+                current_quantity = new_quantity - adjustment_quantity
                 
                 # Record stock movement
                 movement_type = f'ADJUST_{adjustment_type}'
-                reference_number = f"ADJ-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                
-                cursor.execute('''
-                    INSERT INTO stock_movements (product_id, warehouse_id, movement_type, quantity,
-                                               reference_number, notes, user_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (product_id, warehouse_id, movement_type, abs(adjustment_quantity),
-                     reference_number, reason or f'{adjustment_type} adjustment', user_id))
-                
-                cursor.execute('COMMIT')
-                conn.close()
-                
-                logger.info(f"Inventory adjusted: Product {product_id}, Warehouse {warehouse_id}, "
-                           f"Adjustment: {adjustment_quantity}, New total: {new_quantity}")
-                
-                return {
-                    'success': True,
-                    'message': f'Inventory adjusted successfully. New quantity: {new_quantity}',
-                    'previous_quantity': current_quantity,
-                    'new_quantity': new_quantity,
-                    'reference_number': reference_number
-                }
-                
-            except Exception as e:
-                cursor.execute('ROLLBACK')
-                conn.close()
-                raise e
+                reference_number = f"ADJ-{now.strftime('%Y%m%d%H%M%S')}"
                 
+                conn.execute(INSERT_MOVEMENT_SQL,
+                             (product_id, warehouse_id, movement_type, abs(adjustment_quantity),
+                              reference_number, reason or f'{adjustment_type} adjustment', user_id))
+            
+            self._invalidate_cache()
+            
+            logger.info(f"Inventory adjusted: Product {product_id}, Warehouse {warehouse_id}, "
+                       f"Adjustment: {adjustment_quantity}, New total: {new_quantity}")
+            
+            return {
+                'success': True,
+                'message': f'Inventory adjusted successfully. New quantity: {new_quantity}',
+                'previous_quantity': current_quantity,
+                'new_quantity': new_quantity,
+                'reference_number': reference_number
+            }
+            
         except Exception as e:
             logger.error(f"Error adjusting inventory: {e}")
             return {
@@ -399,100 +618,53 @@ class WarehouseController:
                 'message': f'Adjustment failed: {str(e)}'
             }
     
-    def get_warehouse_capacity_report(self) -> List[Dict]:
+    def get_warehouse_capacity_report(self) -> List[CapacityRow]:
         """
         Generate capacity utilization report for all warehouses.
         
         Returns:
-            list: Capacity report for all warehouses
+            list: CapacityRow records; use to_dict() for JSON
         """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT w.id, w.name, w.location, w.capacity,
-                       COALESCE(SUM(i.quantity), 0) as total_items,
-                       COUNT(DISTINCT i.product_id) as unique_products,
-                       COUNT(CASE WHEN i.quantity <= i.reorder_level THEN 1 END) as low_stock_items
-                FROM warehouses w
-                LEFT JOIN inventory i ON w.id = i.warehouse_id
-                GROUP BY w.id, w.name, w.location, w.capacity
-                ORDER BY w.name
-            ''')
-            
-            report = []
-            for row in cursor.fetchall():
-                warehouse_id, name, location, capacity, total_items, unique_products, low_stock_items = row
-                
-                utilization_percentage = 0
-                available_capacity = capacity or 0
-                
-                if capacity and capacity > 0:
-                    utilization_percentage = (total_items / capacity) * 100
-                    available_capacity = capacity - total_items
-                
-                # Determine capacity status
-                if utilization_percentage >= 90:
-                    capacity_status = 'CRITICAL'
-                elif utilization_percentage >= 75:
-                    capacity_status = 'WARNING'
-                else:
-                    capacity_status = 'NORMAL'
-                
-                report.append({
-                    'warehouse_id': warehouse_id,
-                    'warehouse_name': name,
-                    'location': location,
-                    'capacity': capacity,
-                    'total_items': total_items,
-                    'unique_products': unique_products,
-                    'low_stock_items': low_stock_items,
-                    'utilization_percentage': round(utilization_percentage, 2),
-                    'available_capacity': max(0, available_capacity),
-                    'capacity_status': capacity_status
-                })
-            
-            conn.close()
-            return report
+            return [CapacityRow(
+                warehouse_id=row['id'],
+                warehouse_name=row['name'],
+                location=row['location'],
+                capacity=row['capacity'],
+                total_items=row['total_items'],
+                unique_products=row['total_products'],
+                low_stock_items=row['low_stock_products'],
+                utilization_percentage=row['utilization'],
+                available_capacity=row['available_capacity'],
+                capacity_status=_capacity_status(row['utilization'])
+            ) for row in self._warehouse_aggregate_rows()]
             
         except Exception as e:
             logger.error(f"Error generating capacity report: {e}")
             return []
     
     def get_transfer_history(self, warehouse_id: int = None, 
-                            days_back: int = 30) -> List[Dict]:
+                            days_back: int = 30, limit: int = 100,
+                            before: Optional[Tuple] = None) -> Dict:
         """
-        Get transfer history between warehouses.
+        Get transfer history between warehouses, newest first, one page at a time.
         
         Args:
             warehouse_id (int, optional): Specific warehouse to filter by
             days_back (int): Number of days to look back
+            limit (int): Maximum number of transfers to return
+            before (tuple, optional): next_cursor from the previous page
             
         Returns:
-            list: Transfer history records
+            dict: 'items' with the TransferRecord list and 'next_cursor' for
+            the following page, or None when this is the last one
         """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            conn = self._conn()
             
             cutoff_date = datetime.now() - timedelta(days=days_back)
             
-            query = '''
-                SELECT sm1.product_id, p.name as product_name, sm1.warehouse_id as from_warehouse,
-                       sm2.warehouse_id as to_warehouse, sm1.quantity, sm1.reference_number,
-                       sm1.created_at, u.username, sm1.notes,
-                       w1.name as from_warehouse_name, w2.name as to_warehouse_name
-                FROM stock_movements sm1
-                JOIN stock_movements sm2 ON sm1.reference_number = sm2.reference_number
-                JOIN products p ON sm1.product_id = p.id
-                JOIN users u ON sm1.user_id = u.id
-                JOIN warehouses w1 ON sm1.warehouse_id = w1.id
-                JOIN warehouses w2 ON sm2.warehouse_id = w2.id
-                WHERE sm1.movement_type = 'TRANSFER_OUT' 
-                  AND sm2.movement_type = 'TRANSFER_IN'
-                  AND sm1.created_at >= ?
-            '''
+            query = TRANSFER_HISTORY_SQL
             
             params = [cutoff_date]
             
@@ -500,37 +672,46 @@ class WarehouseController:
                 query += ' AND (sm1.warehouse_id = ? OR sm2.warehouse_id = ?)'
                 params.extend([warehouse_id, warehouse_id])
             
-            query += ' ORDER BY sm1.created_at DESC'
+            # Keyset pagination: continue strictly after the last row of the previous page
+            if before:
+                query += ' AND (sm1.created_at, sm1.id, sm2.id) < (?, ?, ?)'
+                params.extend(before)
             
-            cursor.execute(query, params)
+            query += ' ORDER BY sm1.created_at DESC, sm1.id DESC, sm2.id DESC LIMIT ?'
+            params.append(limit)
             
-            transfers = []
-            for row in cursor.fetchall():
-                (product_id, product_name, from_warehouse, to_warehouse, quantity,
-                 reference_number, created_at, username, notes, from_warehouse_name,
-                 to_warehouse_name) = row
-                
-                transfers.append({
-                    'product_id': product_id,
-                    'product_name': product_name,
-                    'from_warehouse_id': from_warehouse,
-                    'to_warehouse_id': to_warehouse,
-                    'from_warehouse_name': from_warehouse_name,
-                    'to_warehouse_name': to_warehouse_name,
-                    'quantity': quantity,
-                    'reference_number': reference_number,
-                    'transfer_date': created_at,
-                    'transferred_by': username,
-                    'notes': notes
-                })
+            cursor = conn.execute(query, params)
             
-            conn.close()
-            return transfers
+            # Build items straight off the cursor; the last row seeds the next page's cursor
+            transfers = []
+            row = None
+            for row in cursor:
+                transfers.append(TransferRecord(
+                    product_id=row['product_id'],
+                    product_name=row['product_name'],
+                    from_warehouse_id=row['from_warehouse'],
+                    to_warehouse_id=row['to_warehouse'],
+                    from_warehouse_name=row['from_warehouse_name'],
+                    to_warehouse_name=row['to_warehouse_name'],
+                    quantity=row['quantity'],
+                    reference_number=row['reference_number'],
+                    transfer_date=row['created_at'],
+                    transferred_by=row['username'],
+                    notes=row['notes']
+                ))
+            cursor.close()
+            
+            next_cursor = None
+            if len(transfers) == limit:
+                next_cursor = (row['created_at'], row['id'], row['in_id'])
+            
+            return {'items': transfers, 'next_cursor': next_cursor}
             
         except Exception as e:
             logger.error(f"Error getting transfer history: {e}")
-            return []
+            return {'items': [], 'next_cursor': None}
     
+    @_ttl_cache(seconds=10)
     def optimize_inventory_distribution(self) -> List[Dict]:
         """
         Analyze inventory distribution and suggest optimizations.
@@ -539,60 +720,32 @@ class WarehouseController:
             list: Optimization suggestions
         """
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            # Find products with uneven distribution across warehouses
-            cursor.execute('''
-                SELECT i.product_id, p.name, 
-                       GROUP_CONCAT(w.name || ':' || i.quantity) as warehouse_quantities,
-                       AVG(i.quantity) as avg_quantity,
-                       MAX(i.quantity) - MIN(i.quantity) as quantity_difference,
-                       COUNT(w.id) as warehouse_count
-                FROM inventory i
-                JOIN products p ON i.product_id = p.id
-                JOIN warehouses w ON i.warehouse_id = w.id
-                GROUP BY i.product_id, p.name
-                HAVING COUNT(w.id) > 1 AND (MAX(i.quantity) - MIN(i.quantity)) > avg_quantity * 0.5
-                ORDER BY quantity_difference DESC
-            ''')
+            conn = self._conn()
+            
+            # Products with uneven distribution, with their fullest and emptiest warehouses
+            cursor = conn.execute(UNEVEN_DISTRIBUTION_SQL)
             
             suggestions = []
-            for row in cursor.fetchall():
-                product_id, product_name, warehouse_quantities, avg_quantity, quantity_difference, warehouse_count = row
-                
-                # Parse warehouse quantities to find imbalances
-                warehouse_data = []
-                for wq in warehouse_quantities.split(','):
-                    warehouse_name, quantity = wq.split(':')
-                    warehouse_data.append({
-                        'warehouse_name': warehouse_name,
-                        'quantity': int(quantity)
-                    })
+            for row in cursor:
+                (product_id, product_name, from_warehouse, from_quantity,
+                 to_warehouse, to_quantity, avg_quantity, quantity_difference) = row
                 
-                # Sort by quantity
-                warehouse_data.sort(key=lambda x: x['quantity'])
+                # Suggest moving half the gap from the fullest to the emptiest warehouse
+                suggested_transfer = int(quantity_difference / 2)
                 
-                # Suggest transfer from highest to lowest
-                highest = warehouse_data[-1]
-                lowest = warehouse_data[0]
-                
-                if highest['quantity'] - lowest['quantity'] > avg_quantity * 0.5:
-                    suggested_transfer = int((highest['quantity'] - lowest['quantity']) / 2)
-                    
-                    suggestions.append({
-                        'product_id': product_id,
-                        'product_name': product_name,
-                        'from_warehouse': highest['warehouse_name'],
-                        'to_warehouse': lowest['warehouse_name'],
-                        'current_from_quantity': highest['quantity'],
-                        'current_to_quantity': lowest['quantity'],
-                        'suggested_transfer': suggested_transfer,
-                        'efficiency_gain': f"Reduces imbalance by {suggested_transfer} units",
-                        'priority': 'HIGH' if quantity_difference > avg_quantity * 2 else 'MEDIUM'
-                    })
-            
-            conn.close()
+                suggestions.append({
+                    'product_id': product_id,
+                    'product_name': product_name,
+                    'from_warehouse': from_warehouse,
+                    'to_warehouse': to_warehouse,
+                    'current_from_quantity': from_quantity,
+                    'current_to_quantity': to_quantity,
+                    'suggested_transfer': suggested_transfer,
+                    'efficiency_gain': f"Reduces imbalance by {suggested_transfer} units",
+                    'priority': 'HIGH' if quantity_difference > avg_quantity * 2 else 'MEDIUM'
+                })
+            cursor.close()
+            
             return suggestions
             
         except Exception as e: